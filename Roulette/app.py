@@ -1,10 +1,37 @@
 from flask import Flask, render_template, jsonify, request
+import atexit
 import subprocess
 import random
 import json
+import os
+import threading
+import time
+
+from simulation import COLOR_NAMES, COLOR_TABLE, simulate
+from spin_log import SpinLog
+from volume_cache import VolumeCache
+
+MAX_SIM_SESSIONS = 100000
+MAX_SIM_SPINS = 10000
+MAX_SIM_TOTAL_SPINS = 10000000  # sessions * spins per request
+VOLUME_CACHE_TTL = 1.0  # Seconds a system volume read is reused
+SPIN_ANIMATION_SECONDS = 4.0  # Wheel animation length; a spin's volume commits when it ends
+# Binary spin history, replayed on startup; set ROULETTE_SPIN_LOG to empty to keep it in memory
+SPIN_LOG_PATH = os.environ.get('ROULETTE_SPIN_LOG',
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), 'spin_history.bin'))
 
 app = Flask(__name__)
 
+# Spin reservations: volume changes that are decided but not yet applied
+spin_lock = threading.Lock()
+commit_lock = threading.Lock()  # Keeps system writes in spin order
+reserved_volume = None  # Volume once every pending spin has committed
+last_spin_id = 0
+committed_spin_id = 0
+
+spin_log = SpinLog(SPIN_LOG_PATH or None)
+atexit.register(spin_log.flush, 5.0)
+
 def get_current_volume():
     """Get current macOS volume level (0-100)"""
     try:
@@ -18,6 +45,9 @@ def get_current_volume():
     except:
         return 50  # Default if unable to get volume
 
+# Shared by every request so polling tabs don't each fork osascript
+volume_cache = VolumeCache(lambda: get_current_volume(), ttl=VOLUME_CACHE_TTL)
+
 def set_volume(level):
     """Set macOS volume level (0-100)"""
     try:
@@ -39,7 +69,7 @@ def index():
 @app.route('/api/volume/current', methods=['GET'])
 def current_volume():
     """Get current volume level"""
-    volume = get_current_volume()
+    volume = volume_cache.get()
     return jsonify({'volume': volume})
 
 @app.route('/api/volume/set', methods=['POST'])
@@ -48,53 +78,131 @@ def set_volume_api():
     data = request.json
     volume = data.get('volume', 50)
     success = set_volume(volume)
-    current = get_current_volume()
+    if success:
+        volume_cache.set(max(0, min(100, int(volume))))
+    current = volume_cache.get()
     return jsonify({'success': success, 'volume': current})
 
 @app.route('/api/roulette/spin', methods=['POST'])
 def spin_roulette():
     """Handle roulette spin and return result with volume change"""
     data = request.json
+    result = roll_spin(volume_cache.get())
+    spin_log.record(result['number'], result['previous_volume'], result['new_volume'])
+    
+    # Don't apply volume change yet - return the target volume
+    # The frontend will apply it after the animation completes
+    
+    return jsonify(result)
+
+def roll_spin(current_vol):
+    """Spin the wheel and work out the volume change from current_vol"""
     spin_result = random.randint(0, 36)
     
     # Calculate volume change based on roulette result
     # Red (1,3,5,7,9,12,14,16,18,19,21,23,25,27,30,32,34,36) = increase volume
     # Black (2,4,6,8,10,11,13,15,17,20,22,24,26,28,29,31,33,35) = decrease volume
     # 0 (green) = random volume
+    color = COLOR_NAMES[COLOR_TABLE[spin_result]]
     
-    red_numbers = [1,3,5,7,9,12,14,16,18,19,21,23,25,27,30,32,34,36]
-    black_numbers = [2,4,6,8,10,11,13,15,17,20,22,24,26,28,29,31,33,35]
-    
-    current_vol = get_current_volume()
-    color = None
-    volume_change = 0
-    
-    if spin_result == 0:
-        color = 'green'
+    if color == 'green':
         # Random volume between 0-100
         new_volume = random.randint(0, 100)
         volume_change = new_volume - current_vol
-    elif spin_result in red_numbers:
-        color = 'red'
+    elif color == 'red':
         # Increase volume by random amount (10-30%)
         volume_change = random.randint(10, 30)
         new_volume = min(100, current_vol + volume_change)
     else:  # black
-        color = 'black'
         # Decrease volume by random amount (10-30%)
         volume_change = -random.randint(10, 30)
         new_volume = max(0, current_vol + volume_change)
     
-    # Don't apply volume change yet - return the target volume
-    # The frontend will apply it after the animation completes
-    
-    return jsonify({
+    return {
         'number': spin_result,
         'color': color,
         'volume_change': volume_change,
         'previous_volume': current_vol,
         'new_volume': new_volume
+    }
+
+@app.route('/api/roulette/play', methods=['POST'])
+def play_roulette():
+    """Spin and schedule the volume change for when the wheel stops
+
+    The result is computed against the authoritative volume, including spins
+    that have been decided but not yet applied, so concurrent tabs never lose
+    each other's changes. The response says when the change will be committed.
+    """
+    global reserved_volume, last_spin_id
+    
+    with spin_lock:
+        base = reserved_volume if reserved_volume is not None else volume_cache.get()
+        result = roll_spin(base)
+        last_spin_id += 1
+        spin_id = last_spin_id
+        reserved_volume = result['new_volume']
+        spin_log.record(result['number'], result['previous_volume'], result['new_volume'])
+    
+    timer = threading.Timer(SPIN_ANIMATION_SECONDS, commit_spin, args=(spin_id, result['new_volume']))
+    timer.daemon = True
+    timer.start()
+    
+    result.update({
+        'spin_id': spin_id,
+        'commit_at': time.time() + SPIN_ANIMATION_SECONDS,
+        'commit_in_ms': int(SPIN_ANIMATION_SECONDS * 1000)
     })
+    return jsonify(result)
+
+def commit_spin(spin_id, level):
+    """Apply a reserved spin's volume once its animation has finished"""
+    global reserved_volume, committed_spin_id
+    
+    with commit_lock:
+        # A later spin already committed; its level includes this one's change
+        if spin_id <= committed_spin_id:
+            return
+        committed_spin_id = spin_id
+        if set_volume(level):
+            volume_cache.set(level)
+    
+    with spin_lock:
+        if spin_id == last_spin_id:
+            reserved_volume = None
+
+@app.route('/api/roulette/stats', methods=['GET'])
+def roulette_stats():
+    """Return running statistics over every recorded spin"""
+    return jsonify(spin_log.summary())
+
+@app.route('/api/roulette/simulate', methods=['POST'])
+def simulate_roulette():
+    """Run a Monte Carlo simulation of many roulette sessions
+
+    Expects {"sessions", "spins", "start_volume", "seed"} (all optional) and
+    returns percentile bands of the volume paths and first-passage statistics
+    for 0% and 100%.
+    """
+    data = request.get_json(silent=True) or {}
+    try:
+        sessions = int(data.get('sessions', 1000))
+        spins = int(data.get('spins', 1000))
+        start_volume = int(data.get('start_volume', volume_cache.get()))
+        seed = data.get('seed')
+        seed = None if seed is None else int(seed)
+    except (TypeError, ValueError):
+        return jsonify({'error': 'sessions, spins, start_volume and seed must be integers'}), 400
+
+    if not (1 <= sessions <= MAX_SIM_SESSIONS and 1 <= spins <= MAX_SIM_SPINS):
+        return jsonify({'error': f'sessions must be 1-{MAX_SIM_SESSIONS} and spins 1-{MAX_SIM_SPINS}'}), 400
+    if sessions * spins > MAX_SIM_TOTAL_SPINS:
+        return jsonify({'error': f'At most {MAX_SIM_TOTAL_SPINS} total spins per simulation'}), 400
+
+    start = time.perf_counter()
+    result = simulate(sessions, spins, start_volume=start_volume, seed=seed)
+    result['elapsed_ms'] = round((time.perf_counter() - start) * 1000, 1)
+    return jsonify(result)
 
 if __name__ == '__main__':
     app.run(debug=True, port=5000)
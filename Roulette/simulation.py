@@ -0,0 +1,100 @@
+"""Vectorized Monte Carlo simulation of Volume Roulette sessions.
+
+Runs many independent sessions of many spins at once with NumPy: spins are
+drawn in one batch, colors come from a lookup table indexed by the pocket
+number, and volume paths are advanced one spin at a time across all
+sessions, clamped to 0-100 like the real game.
+"""
+
+import numpy as np
+
+GREEN, RED, BLACK = 0, 1, 2
+COLOR_NAMES = ('green', 'red', 'black')
+
+RED_NUMBERS = (1, 3, 5, 7, 9, 12, 14, 16, 18, 19, 21, 23, 25, 27, 30, 32, 34, 36)
+
+# Pocket number -> color code
+COLOR_TABLE = np.full(37, BLACK, dtype=np.int8)
+COLOR_TABLE[0] = GREEN
+COLOR_TABLE[list(RED_NUMBERS)] = RED
+
+MIN_STEP = 10  # Smallest volume change on red/black
+MAX_STEP = 30  # Largest volume change on red/black
+
+
+def simulate(sessions, spins, start_volume=50, seed=None,
+             percentiles=(5, 25, 50, 75, 95), max_points=200):
+    """Simulate volume trajectories for independent roulette sessions.
+
+    Args:
+        sessions: Number of independent sessions
+        spins: Spins per session
+        start_volume: Volume every session starts at (0-100)
+        seed: Seed for reproducible results
+        percentiles: Percentile bands to report across sessions
+        max_points: Most points per band; long paths are sampled evenly
+
+    Returns:
+        Dict with percentile bands, absorption statistics and color counts
+    """
+    rng = np.random.default_rng(seed)
+    start_volume = int(np.clip(start_volume, 0, 100))
+
+    # Draw every spin up front: (spins, sessions)
+    numbers = rng.integers(0, 37, size=(spins, sessions), dtype=np.int8)
+    colors = COLOR_TABLE[numbers]
+    steps = rng.integers(MIN_STEP, MAX_STEP + 1, size=(spins, sessions), dtype=np.int16)
+    deltas = np.where(colors == BLACK, -steps, steps)
+    green = colors == GREEN
+    green_levels = rng.integers(0, 101, size=(spins, sessions), dtype=np.int16)
+
+    # Clamping makes each step depend on the last, so walk time and vectorize sessions
+    paths = np.empty((spins + 1, sessions), dtype=np.int16)
+    paths[0] = start_volume
+    volume = paths[0].copy()
+    for t in range(spins):
+        np.add(volume, deltas[t], out=volume)
+        np.clip(volume, 0, 100, out=volume)
+        np.copyto(volume, green_levels[t], where=green[t])
+        paths[t + 1] = volume
+
+    points = np.unique(np.linspace(0, spins, min(spins + 1, max_points)).astype(np.int64))
+    bands = np.percentile(paths[points], percentiles, axis=1)
+
+    return {
+        'sessions': sessions,
+        'spins': spins,
+        'start_volume': start_volume,
+        'steps': points.tolist(),
+        'bands': {
+            f'p{p:g}': np.round(band, 2).tolist()
+            for p, band in zip(percentiles, bands)
+        },
+        'absorption': {
+            'zero': first_passage(paths, 0),
+            'hundred': first_passage(paths, 100),
+            'either': first_passage(paths, 0, 100)
+        },
+        'final_volume': {
+            'mean': float(paths[-1].mean()),
+            'std': float(paths[-1].std())
+        },
+        'color_counts': {
+            name: int(count)
+            for name, count in zip(COLOR_NAMES, np.bincount(colors.ravel(), minlength=3))
+        }
+    }
+
+
+def first_passage(paths, *levels):
+    """Summarize the first spin at which each session reaches any of levels."""
+    hit = np.isin(paths[1:], levels)
+    reached = hit.any(axis=0)
+    first = hit.argmax(axis=0)[reached] + 1  # Spin number of the first hit
+    sessions = paths.shape[1]
+    return {
+        'fraction': float(reached.sum() / sessions) if sessions else 0.0,
+        'mean_spins': float(first.mean()) if first.size else None,
+        'median_spins': float(np.median(first)) if first.size else None,
+        'time_at_level': float(hit.mean()) if hit.size else 0.0
+    }
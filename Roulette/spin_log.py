@@ -0,0 +1,189 @@
+"""Append-only spin history with running statistics.
+
+Each spin is stored as a fixed-size binary record. Counts per number and
+color, streaks and a histogram of volume changes are kept up to date in
+memory as spins are recorded, so reading statistics never rescans the
+history. On startup the log is replayed (vectorized with NumPy) to rebuild
+them. Records are written by a background thread, so recording a spin only
+costs an in-memory update.
+"""
+
+import os
+import queue
+import struct
+import threading
+import time
+
+import numpy as np
+
+from simulation import COLOR_NAMES, COLOR_TABLE
+
+# timestamp, number, previous volume, new volume
+RECORD = struct.Struct('<dBBB')
+RECORD_DTYPE = np.dtype([('ts', '<f8'), ('number', 'u1'), ('previous', 'u1'), ('new', 'u1')])
+
+
+class SpinStats:
+    """Running aggregates over every recorded spin."""
+
+    def __init__(self):
+        self.total = 0
+        self.number_counts = [0] * 37
+        self.color_counts = [0] * len(COLOR_NAMES)
+        self.delta_counts = [0] * 201  # Index delta + 100, for deltas -100..100
+        self.delta_sum = 0
+        self.streak_color = None
+        self.streak_length = 0
+        self.longest_streaks = [0] * len(COLOR_NAMES)
+
+    def add(self, number, previous, new):
+        color = int(COLOR_TABLE[number])
+        delta = new - previous
+        self.total += 1
+        self.number_counts[number] += 1
+        self.color_counts[color] += 1
+        self.delta_counts[delta + 100] += 1
+        self.delta_sum += delta
+
+        if color == self.streak_color:
+            self.streak_length += 1
+        else:
+            self.streak_color = color
+            self.streak_length = 1
+        self.longest_streaks[color] = max(self.longest_streaks[color], self.streak_length)
+
+    def add_many(self, records):
+        """Fold a structured array of records in at once (used for replay)."""
+        if not len(records):
+            return
+        numbers = records['number'].astype(np.int64)
+        colors = COLOR_TABLE[numbers].astype(np.int64)
+        deltas = records['new'].astype(np.int64) - records['previous'].astype(np.int64)
+
+        self.total += len(records)
+        self.number_counts = (np.array(self.number_counts) + np.bincount(numbers, minlength=37)).tolist()
+        self.color_counts = (np.array(self.color_counts) +
+                             np.bincount(colors, minlength=len(COLOR_NAMES))).tolist()
+        self.delta_counts = (np.array(self.delta_counts) + np.bincount(deltas + 100, minlength=201)).tolist()
+        self.delta_sum += int(deltas.sum())
+
+        # Run-length encode the colors to find streaks
+        starts = np.flatnonzero(np.diff(colors, prepend=-1))
+        lengths = np.diff(np.append(starts, len(colors)))
+        run_colors = colors[starts]
+        if run_colors[0] == self.streak_color:
+            lengths[0] += self.streak_length
+        for color in range(len(COLOR_NAMES)):
+            runs = lengths[run_colors == color]
+            if runs.size:
+                self.longest_streaks[color] = max(self.longest_streaks[color], int(runs.max()))
+        self.streak_color = int(run_colors[-1])
+        self.streak_length = int(lengths[-1])
+
+    def summary(self, bin_width=10):
+        """Return the aggregates as a JSON-friendly dict."""
+        bins = {}
+        for index, count in enumerate(self.delta_counts):
+            if count:
+                low = (index - 100) // bin_width * bin_width
+                bins[low] = bins.get(low, 0) + count
+        return {
+            'total_spins': self.total,
+            'number_counts': list(self.number_counts),
+            'color_counts': dict(zip(COLOR_NAMES, self.color_counts)),
+            'current_streak': {
+                'color': COLOR_NAMES[self.streak_color] if self.streak_color is not None else None,
+                'length': self.streak_length
+            },
+            'longest_streaks': dict(zip(COLOR_NAMES, self.longest_streaks)),
+            'mean_volume_change': self.delta_sum / self.total if self.total else 0.0,
+            'volume_change_histogram': {
+                'bin_width': bin_width,
+                'bins': [{'from': low, 'to': low + bin_width - 1, 'count': bins[low]}
+                         for low in sorted(bins)]
+            }
+        }
+
+
+class SpinLog:
+    """Spin history file plus its running statistics."""
+
+    def __init__(self, path=None, flush_interval=0.5):
+        """
+        Args:
+            path: Log file, or None to keep statistics in memory only
+            flush_interval: Seconds the writer waits to batch records before writing
+        """
+        self.path = path
+        self.flush_interval = flush_interval
+        self.stats = SpinStats()
+        self._lock = threading.Lock()
+        self._pending = queue.SimpleQueue()
+        self._flushed = threading.Condition()
+        self._queued = 0
+        self._written = 0
+        self._writer = None
+
+        if path:
+            self._replay()
+            self._writer = threading.Thread(target=self._write_behind, name='spin-log-writer',
+                                            daemon=True)
+            self._writer.start()
+
+    def _replay(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        whole = len(data) - len(data) % RECORD.size
+        if whole != len(data):
+            # Drop a partial record left by an interrupted write
+            with open(self.path, 'r+b') as f:
+                f.truncate(whole)
+        self.stats.add_many(np.frombuffer(data[:whole], dtype=RECORD_DTYPE))
+
+    def record(self, number, previous, new, ts=None):
+        """Record a spin: update the statistics now and queue the disk write."""
+        with self._lock:
+            self.stats.add(number, previous, new)
+        if self._writer is not None:
+            with self._flushed:
+                self._queued += 1
+            self._pending.put(RECORD.pack(time.time() if ts is None else ts, number, previous, new))
+
+    def summary(self):
+        """Return the current statistics."""
+        with self._lock:
+            return self.stats.summary()
+
+    def flush(self, timeout=None):
+        """Wait until every queued record is written. Returns True if it was."""
+        with self._flushed:
+            target = self._queued
+            return self._flushed.wait_for(lambda: self._written >= target, timeout=timeout)
+
+    def _write_behind(self):
+        f = None
+        while True:
+            records = [self._pending.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    records.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                if f is None:
+                    f = open(self.path, 'ab')
+                f.write(b''.join(records))
+                f.flush()
+            except OSError as e:
+                print(f"Error writing spin log: {e}")
+
+            with self._flushed:
+                self._written += len(records)
+                self._flushed.notify_all()
@@ -163,7 +163,7 @@ window.addEventListener('DOMContentLoaded', () => {
 
 async function updateVolumeDisplay() {
     try {
-        const response = await fetch('/api/volume/current');
+        const response = await fetch('api/volume/current');
         const data = await response.json();
         const volume = data.volume;
         
@@ -186,7 +186,8 @@ async function spinRoulette() {
     resultPanel.style.display = 'none';
     
     try {
-        const response = await fetch('/api/roulette/spin', {
+        // The server picks the result and commits the volume when the wheel stops
+        const response = await fetch('api/roulette/play', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
@@ -209,36 +210,27 @@ async function spinRoulette() {
             ? parseFloat(wheelSvg.style.transform.match(/rotate\(([^)]+)\)/)[1]) || 0 
             : 0;
         
+        // Match the animation to the server's commit deadline
+        const duration = result.commit_in_ms;
+        
         // Start clicking sounds
-        startClickingSounds();
+        startClickingSounds(duration);
         
         // Add spinning animation
-        wheelSvg.style.transition = 'transform 4s cubic-bezier(0.17, 0.67, 0.12, 0.99)';
+        wheelSvg.style.transition = `transform ${duration}ms cubic-bezier(0.17, 0.67, 0.12, 0.99)`;
         wheelSvg.style.transform = `rotate(${currentRotation + finalRotation}deg)`;
         
-        // Wait for animation to complete, then apply volume change
-        setTimeout(async () => {
+        // Wait for animation to complete; the server applies the volume at the same time
+        setTimeout(() => {
             // Stop clicking sounds
             stopClickingSounds();
             
-            // Apply the volume change after the wheel stops spinning
-            try {
-                await fetch('/api/volume/set', {
-                    method: 'POST',
-                    headers: {
-                        'Content-Type': 'application/json'
-                    },
-                    body: JSON.stringify({ volume: result.new_volume })
-                });
-            } catch (error) {
-                console.error('Error setting volume:', error);
-            }
-            
             displayResult(result);
-            updateVolumeDisplay();
+            document.getElementById('currentVolume').textContent = result.new_volume + '%';
+            document.getElementById('volumeBar').style.width = result.new_volume + '%';
             spinButton.disabled = false;
             isSpinning = false;
-        }, 4000);
+        }, duration);
         
     } catch (error) {
         console.error('Error spinning roulette:', error);
@@ -250,7 +242,7 @@ async function spinRoulette() {
 }
 
 // Start clicking sounds with decreasing frequency (like a real roulette wheel)
-function startClickingSounds() {
+function startClickingSounds(duration = 4000) {
     initAudioContext();
     
     // Clear any existing timeouts
@@ -259,7 +251,6 @@ function startClickingSounds() {
     }
     
     const startTime = Date.now();
-    const duration = 4000; // 4 seconds
     const totalClicks = 50; // Total number of clicks
     
     // Play initial click
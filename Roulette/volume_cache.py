@@ -0,0 +1,71 @@
+"""Short-lived cache of the system volume with single-flight refreshes.
+
+Every open tab polls the current volume, and each uncached read forks
+osascript. The cache answers from memory while its value is fresh, collapses
+concurrent misses into one backend read, and is updated directly by local
+writes so they never need a read-back.
+"""
+
+import threading
+import time
+
+
+class VolumeCache:
+    """Caches the system volume for a few seconds at most."""
+
+    def __init__(self, reader, ttl=1.0, clock=time.monotonic):
+        """
+        Args:
+            reader: Callable returning the system volume (0-100)
+            ttl: Seconds a read stays fresh
+            clock: Monotonic time source
+        """
+        self.reader = reader
+        self.ttl = ttl
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._value = None
+        self._expires = 0.0
+        self._generation = 0  # Bumped by local writes so stale reads are discarded
+        self._in_flight = False
+        self.backend_reads = 0
+        self.hits = 0
+
+    def get(self):
+        """Return the volume, reading the system only if the cached value is stale."""
+        with self._cond:
+            while True:
+                if self._value is not None and self.clock() < self._expires:
+                    self.hits += 1
+                    return self._value
+                if not self._in_flight:
+                    break
+                # Someone else is already reading; share their result
+                self._cond.wait()
+            self._in_flight = True
+            generation = self._generation
+
+        try:
+            level = self.reader()
+        except Exception:
+            with self._cond:
+                self._in_flight = False
+                self._cond.notify_all()
+            raise
+
+        with self._cond:
+            self.backend_reads += 1
+            self._in_flight = False
+            if generation == self._generation:
+                self._value = level
+                self._expires = self.clock() + self.ttl
+            self._cond.notify_all()
+            return self._value if self._value is not None else level
+
+    def set(self, level):
+        """Record a volume the server just wrote, so it need not be read back."""
+        with self._cond:
+            self._generation += 1
+            self._value = level
+            self._expires = self.clock() + self.ttl
+            self._cond.notify_all()
@@ -1,24 +1,61 @@
-from flask import Flask, render_template, Response, jsonify
+from flask import Flask, render_template, Response, jsonify, request
+import atexit
 import random
 import cv2
-import mediapipe as mp
 import numpy as np
+import os
 import subprocess
+import threading
+import time
+
+from broadcast import FrameBroadcaster
+from frame_encoder import DEFAULT_PROFILE, PROFILES, AdaptiveQuality, FrameEncoder
+from frame_rate import RateMeter
+from pose_pool import PosePool
+from pose_worker import PoseWorker
+from rep_detector import JumpingJackDetector, LandmarkRecorder, landmarks_to_array
+from volume_state import VolumeState
 
 app = Flask(__name__)
 
-# Initialize MediaPipe pose detection
-mp_pose = mp.solutions.pose
-mp_drawing = mp.solutions.drawing_utils
-pose = mp_pose.Pose(
+# Pose inference settings
+model_complexity = int(os.environ.get('JJ_MODEL_COMPLEXITY', 1))  # 0 (fastest) to 2 (most accurate)
+inference_every = int(os.environ.get('JJ_INFERENCE_EVERY', 1))  # Run inference on every Nth frame
+inference_max_fps = float(os.environ.get('JJ_INFERENCE_MAX_FPS', 0))  # 0 for no limit
+interpolate_landmarks = os.environ.get('JJ_INTERPOLATE', '1') != '0'  # Project landmarks between inferences
+pose_pool_size = int(os.environ.get('JJ_POSE_POOL_SIZE', 1))  # Pose graphs shared by concurrent callers
+
+# MediaPipe pose detection; warm_up() imports it and builds the first graph in
+# the background once the app is serving, so the server can bind straight away
+mp_pose = None
+model_ready = threading.Event()
+warm_up_lock = threading.Lock()
+warm_up_thread = None  # Started by the serving process, not on import
+model_error = None
+pose_pool = PosePool(lambda: mp_pose.Pose(
+    model_complexity=model_complexity,
     min_detection_confidence=0.5,
     min_tracking_confidence=0.5
-)
+), size=pose_pool_size)
+atexit.register(pose_pool.close)
 
 # Global variables
 jumping_jacks_count = 0
 is_tracking = False
 volume_up = True
+volume_refresh_interval = 5.0  # Seconds between background reads of the system volume
+producer_idle_timeout = 5.0  # Seconds the camera stays open after the last viewer leaves
+recording_dir = os.environ.get('JJ_RECORDING_DIR',
+                               os.path.join(os.path.dirname(os.path.abspath(__file__)), 'recordings'))
+recorder = None  # LandmarkRecorder while a landmark recording is running
+recorder_lock = threading.Lock()  # Held while adding to, swapping or saving the recorder
+
+# Video producer: one thread captures, tracks and encodes; every viewer shares its frames
+broadcaster = FrameBroadcaster()
+encoder = FrameEncoder()
+producer_lock = threading.Lock()
+producer_thread = None
+camera_source = None  # (index, backend) of the last camera that opened, tried first next time
 
 # Set macOS volume
 def set_volume(level):
@@ -42,156 +79,248 @@ def get_volume():
     except Exception:
         return 50
 
-# Detect jumping jacks
-class JumpingJackDetector:
-    def __init__(self):
-        self.previous_left_wrist_y = None
-        self.previous_right_wrist_y = None
-        self.left_arm_up = False
-        self.right_arm_up = False
-        self.left_arm_down = False
-        self.right_arm_down = False
-        
-    def detect(self, landmarks, image_width, image_height):
-        global jumping_jacks_count
-        
-        # Get key points
-        left_wrist = [landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value].x * image_width,
-                     landmarks[mp_pose.PoseLandmark.LEFT_WRIST.value].y * image_height]
-        right_wrist = [landmarks[mp_pose.PoseLandmark.RIGHT_WRIST.value].x * image_width,
-                      landmarks[mp_pose.PoseLandmark.RIGHT_WRIST.value].y * image_height]
-        left_shoulder = [landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].x * image_width,
-                        landmarks[mp_pose.PoseLandmark.LEFT_SHOULDER.value].y * image_height]
-        right_shoulder = [landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value].x * image_width,
-                         landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value].y * image_height]
-        left_ankle = [landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value].x * image_width,
-                     landmarks[mp_pose.PoseLandmark.LEFT_ANKLE.value].y * image_height]
-        right_ankle = [landmarks[mp_pose.PoseLandmark.RIGHT_ANKLE.value].x * image_width,
-                      landmarks[mp_pose.PoseLandmark.RIGHT_ANKLE.value].y * image_height]
-        
-        # Detect vertical movement of wrists relative to shoulders
-        if self.previous_left_wrist_y is not None and self.previous_right_wrist_y is not None:
-            # Check if arms are going up
-            if left_wrist[1] < left_shoulder[1] - 20 and not self.left_arm_up:
-                self.left_arm_up = True
-                self.left_arm_down = False
-            # Check if arms are going down
-            if left_wrist[1] > left_shoulder[1] + 20 and self.left_arm_up and not self.left_arm_down:
-                self.left_arm_down = True
-                
-            if right_wrist[1] < right_shoulder[1] - 20 and not self.right_arm_up:
-                self.right_arm_up = True
-                self.right_arm_down = False
-            if right_wrist[1] > right_shoulder[1] + 20 and self.right_arm_up and not self.right_arm_down:
-                self.right_arm_down = True
-            
-            # Detect complete cycle (both arms up then down)
-            if self.left_arm_up and self.right_arm_up and self.left_arm_down and self.right_arm_down:
-                jumping_jacks_count += 1
-                # Reset flags
-                self.left_arm_up = False
-                self.right_arm_up = False
-                self.left_arm_down = False
-                self.right_arm_down = False
-                global volume_up
-                volume_increment = random.randint(1, 10)
-                if get_volume() == 100:
-                    volume_up = False
-                elif get_volume() == 0:
-                    volume_up = True
-                
-                if volume_up:
-                    new_volume = min(100, get_volume() + volume_increment)
-                else:
-                    new_volume = max(0, get_volume() - volume_increment)
-                    
-                set_volume(new_volume)
-        
-        self.previous_left_wrist_y = left_wrist[1]
-        self.previous_right_wrist_y = right_wrist[1]
-        
-        return {
-            'left_arm_up': self.left_arm_up,
-            'right_arm_up': self.right_arm_up,
-            'left_arm_down': self.left_arm_down,
-            'right_arm_down': self.right_arm_down
-        }
+# Authoritative volume level; the frame loop and /status read it without forking osascript
+volume = VolumeState(lambda: get_volume(), lambda level: set_volume(level),
+                     refresh_interval=volume_refresh_interval)
 
 detector = JumpingJackDetector()
 
-def generate_frames():
-    global is_tracking
+def estimate_pose(rgb_frame):
+    """Run MediaPipe on one frame and return its (33, 4) landmark array, or None"""
+    if not model_ready.is_set():
+        return None
+    with pose_pool.checkout(owner='camera') as pose:
+        results = pose.process(rgb_frame)
+    return landmarks_to_array(results.pose_landmarks.landmark) if results.pose_landmarks else None
+
+def count_reps(points, ts, rgb_frame):
+    """Feed each inference result to the rep detector, in capture order"""
+    global jumping_jacks_count, volume_up
+    if not is_tracking:
+        return
+    aspect = rgb_frame.shape[1] / rgb_frame.shape[0]
+    with recorder_lock:
+        current = recorder
+        if current is not None:
+            current.aspect = aspect
+            current.add(ts, points)
+    if not detector.update(points, aspect)['rep']:
+        return
+    
+    jumping_jacks_count += 1
+    volume_increment = random.randint(1, 10)
+    current_volume = volume.get()
+    if current_volume == 100:
+        volume_up = False
+    elif current_volume == 0:
+        volume_up = True
+    
+    if volume_up:
+        new_volume = min(100, current_volume + volume_increment)
+    else:
+        new_volume = max(0, current_volume - volume_increment)
+        
+    volume.set(new_volume)
+
+# Inference runs beside the video stream so streaming keeps the camera's frame rate
+pose_worker = PoseWorker(estimate_pose, on_result=count_reps,
+                         every=inference_every, max_fps=inference_max_fps)
+stream_rate = RateMeter()
+
+def draw_pose(frame, points):
+    """Draw landmarks given as a (33, 4) array of normalized x, y, z, visibility"""
+    height, width = frame.shape[:2]
+    visible = points[:, 3] > 0.5
+    pixels = (points[:, :2] * (width, height)).astype(int)
+    for start, end in mp_pose.POSE_CONNECTIONS:
+        if visible[start] and visible[end]:
+            cv2.line(frame, tuple(pixels[start]), tuple(pixels[end]), (0, 0, 255), 2)
+    for point, shown in zip(pixels, visible):
+        if shown:
+            cv2.circle(frame, tuple(point), 2, (0, 255, 0), 2)
+
+def open_camera():
+    """Open the camera that worked last time, or the first working one, or return None"""
+    global camera_source
+    if camera_source is not None:
+        camera = cv2.VideoCapture(*camera_source)
+        if camera.isOpened():
+            return camera
+        camera.release()
+        print(f"Camera {camera_source[0]} stopped working, probing again")
+        camera_source = None
     
-    # Try to open camera with different backends
-    camera = None
     for i in range(3):  # Try camera indices 0, 1, 2
         camera = cv2.VideoCapture(i)
         if camera.isOpened():
-            print(f"Successfully opened camera {i}")
-            break
+            backend = getattr(cv2, 'CAP_' + camera.getBackendName(), cv2.CAP_ANY)
+            camera_source = (i, backend)
+            print(f"Successfully opened camera {i} ({camera.getBackendName()})")
+            return camera
         camera.release()
+    return None
+
+def warm_up():
+    """Load MediaPipe, run one dummy inference and find the camera, off the request path"""
+    global mp_pose, model_error
+    try:
+        import mediapipe as mp
+        mp_pose = mp.solutions.pose
+        # The first inference initializes the graph's calculators; do it before anyone waits
+        with pose_pool.checkout(owner='camera') as pose:
+            pose.process(np.zeros((480, 640, 3), dtype=np.uint8))
+        model_ready.set()
+    except Exception as e:
+        model_error = str(e)
+        print(f"Error loading pose model: {e}")
+    
+    # Probe once now so the first viewer opens the cached camera directly
+    with producer_lock:
+        if producer_thread is None:
+            camera = open_camera()
+            if camera is not None:
+                camera.release()
+
+def start_warm_up():
+    """Start warm_up() on a background thread, once per process"""
+    global warm_up_thread
+    with warm_up_lock:
+        if warm_up_thread is None:
+            warm_up_thread = threading.Thread(target=warm_up, name='warm-up', daemon=True)
+            warm_up_thread.start()
+
+def encode_error_frame():
+    """Return a JPEG explaining that no camera could be opened"""
+    blank_frame = np.zeros((480, 640, 3), dtype=np.uint8)
+    cv2.putText(blank_frame, "ERROR: Cannot access camera", (50, 240),
+               cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 3)
+    cv2.putText(blank_frame, "Check permissions in System Settings", (50, 290),
+               cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 165, 0), 2)
+    ret, buffer = cv2.imencode('.jpg', blank_frame)
+    return buffer.tobytes() if ret else None
+
+def produce_frames():
+    """Capture, track and encode frames once for every viewer
+
+    Runs on its own thread while anyone is watching, and releases the camera
+    once nobody has been for producer_idle_timeout seconds.
+    """
+    global producer_thread
     
-    if camera is None or not camera.isOpened():
+    camera = open_camera()
+    
+    if camera is None:
         print("ERROR: Cannot open any camera")
-        # Send a blank frame with error message
-        blank_frame = np.zeros((480, 640, 3), dtype=np.uint8)
-        cv2.putText(blank_frame, "ERROR: Cannot access camera", (50, 240),
-                   cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 255), 3)
-        cv2.putText(blank_frame, "Check permissions in System Settings", (50, 290),
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 165, 0), 2)
-        ret, buffer = cv2.imencode('.jpg', blank_frame)
-        if ret:
-            frame_bytes = buffer.tobytes()
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+        frame_bytes = encode_error_frame()
+        if frame_bytes:
+            broadcaster.publish(frame_bytes)
+        with producer_lock:
+            broadcaster.end()
+            producer_thread = None
         return
     
     camera.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
     camera.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
     
-    while True:
-        success, frame = camera.read()
-        if not success:
-            print("ERROR: Failed to read from camera")
-            break
-        
-        # Flip frame horizontally for mirror effect
-        frame = cv2.flip(frame, 1)
-        
-        if is_tracking:
-            # Convert BGR to RGB for MediaPipe
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = pose.process(rgb_frame)
+    idle_since = None
+    try:
+        while True:
+            if len(broadcaster):
+                idle_since = None
+            elif idle_since is None:
+                idle_since = time.monotonic()
+            elif time.monotonic() - idle_since > producer_idle_timeout:
+                with producer_lock:
+                    # Viewers subscribe under producer_lock, so this check is final
+                    if not len(broadcaster):
+                        camera.release()
+                        producer_thread = None
+                        return
+                idle_since = None
+            
+            success, frame = camera.read()
+            if not success:
+                print("ERROR: Failed to read from camera")
+                break
+            captured_at = time.monotonic()
+            
+            # Flip frame horizontally for mirror effect
+            frame = cv2.flip(frame, 1)
             
-            # Draw pose landmarks
-            if results.pose_landmarks:
-                mp_drawing.draw_landmarks(
-                    frame,
-                    results.pose_landmarks,
-                    mp_pose.POSE_CONNECTIONS,
-                    mp_drawing.DrawingSpec(color=(0, 255, 0), thickness=2, circle_radius=2),
-                    mp_drawing.DrawingSpec(color=(0, 0, 255), thickness=2)
-                )
+            if is_tracking:
+                # Hand inference a copy; this frame is drawn on below
+                pose_worker.submit(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB), captured_at)
                 
-                # Detect jumping jacks
-                detector.detect(results.pose_landmarks.landmark, frame.shape[1], frame.shape[0])
-        
-        # Display count
-        cv2.putText(frame, f'Jumping Jacks: {jumping_jacks_count}', 
-                   (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 3)
-        cv2.putText(frame, f'Volume: {get_volume()}%', 
-                   (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 165, 0), 3)
-        cv2.putText(frame, 'Status: Tracking' if is_tracking else 'Status: Stopped', 
-                   (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255) if is_tracking else (128, 128, 128), 3)
-        
-        # Encode frame
-        ret, buffer = cv2.imencode('.jpg', frame)
-        if ret:
-            frame_bytes = buffer.tobytes()
-            yield (b'--frame\r\n'
-                   b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+                # Draw the latest landmarks, projected to this frame
+                points = pose_worker.landmarks(captured_at, interpolate=interpolate_landmarks)
+                if points is not None:
+                    draw_pose(frame, points)
+            
+            # Display count
+            cv2.putText(frame, f'Jumping Jacks: {jumping_jacks_count}', 
+                       (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 0), 3)
+            cv2.putText(frame, f'Volume: {volume.get()}%', 
+                       (10, 80), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 165, 0), 3)
+            cv2.putText(frame, 'Status: Tracking' if is_tracking else 'Status: Stopped', 
+                       (10, 120), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (0, 255, 255) if is_tracking else (128, 128, 128), 3)
+            
+            stream_rate.tick()
+            
+            # Encode once per (profile, quality) being watched; nothing if nobody is.
+            # Viewers change their quality from their own threads, so snapshot it once
+            # and publish each viewer the exact encoding made for it.
+            wanted = {sub: (sub.profile, sub.quality) for sub in broadcaster.subscriptions()}
+            if wanted:
+                encoded = encoder.encode_all(frame, set(wanted.values()))
+                broadcaster.publish_each(lambda sub: encoded.get(wanted.get(sub)))
+    except Exception as e:
+        print(f"Error producing frames: {e}")
+    
+    # The camera failed; end every stream so viewers can reconnect
+    with producer_lock:
+        camera.release()
+        broadcaster.end()
+        producer_thread = None
+
+def generate_frames(profile=DEFAULT_PROFILE):
+    """Stream the shared frames to one viewer, skipping any it is too slow for
+
+    The viewer's JPEG quality drops while it misses frames and recovers once
+    it keeps up.
+    """
+    global producer_thread
+    
+    quality = AdaptiveQuality(PROFILES[profile][2])
+    with producer_lock:
+        subscription = broadcaster.subscribe(profile, quality.quality)
+        if producer_thread is None:
+            producer_thread = threading.Thread(target=produce_frames, name='video-producer', daemon=True)
+            producer_thread.start()
+    
+    try:
+        dropped = 0
+        while True:
+            frame_bytes = subscription.get(timeout=5.0)
+            if frame_bytes is None:
+                if subscription.closed:
+                    break
+                continue
+            
+            # Frames overwritten before we took them mean the connection is backing up
+            subscription.quality = quality.update(subscription.dropped - dropped)
+            dropped = subscription.dropped
+            
+            chunk = (b'--frame\r\n'
+                     b'Content-Type: image/jpeg\r\n\r\n' + frame_bytes + b'\r\n')
+            subscription.sent(len(chunk))
+            yield chunk
+    finally:
+        subscription.close()
 
-    camera.release()
+@app.before_request
+def ensure_warm_up():
+    # Covers servers that import the app (e.g. the launcher) rather than run it
+    start_warm_up()
 
 @app.route('/')
 def index():
@@ -199,9 +328,32 @@ def index():
 
 @app.route('/video_feed')
 def video_feed():
-    return Response(generate_frames(),
+    profile = request.args.get('profile', DEFAULT_PROFILE)
+    if profile not in PROFILES:
+        return jsonify({'error': f"profile must be one of {', '.join(PROFILES)}"}), 400
+    return Response(generate_frames(profile),
                    mimetype='multipart/x-mixed-replace; boundary=frame')
 
+@app.route('/streams', methods=['GET'])
+def get_streams():
+    """Report encode cost and per-viewer delivery rates"""
+    return jsonify({
+        'stream_fps': round(stream_rate.rate(), 1),
+        'frame_encode_ms': round(encoder.frame_encode_ms, 2),
+        # Copy first: the producer thread adds profiles as viewers ask for them
+        'encode_ms': {profile: round(ms, 2) for profile, ms in dict(encoder.encode_ms).items()},
+        'viewers': [{
+            'id': sub.id,
+            'profile': sub.profile,
+            'quality': sub.quality,
+            'fps': round(sub.frame_rate.rate(), 1),
+            'bytes_per_second': round(sub.byte_rate.rate()),
+            'bytes_sent': sub.bytes_sent,
+            'delivered': sub.delivered,
+            'dropped': sub.dropped
+        } for sub in sorted(broadcaster.subscriptions(), key=lambda sub: sub.id)]
+    })
+
 @app.route('/start', methods=['POST'])
 def start_tracking():
     global is_tracking
@@ -212,6 +364,8 @@ def start_tracking():
 def stop_tracking():
     global is_tracking
     is_tracking = False
+    pose_worker.reset()
+    pose_pool.reset()
     return jsonify({'status': 'stopped'})
 
 @app.route('/reset', methods=['POST'])
@@ -220,14 +374,53 @@ def reset_count():
     jumping_jacks_count = 0
     return jsonify({'status': 'reset', 'count': jumping_jacks_count})
 
+@app.route('/recording/start', methods=['POST'])
+def start_recording():
+    """Record the landmarks of every inference while tracking"""
+    global recorder
+    with recorder_lock:
+        recorder = LandmarkRecorder()
+    return jsonify({'status': 'recording'})
+
+@app.route('/recording/stop', methods=['POST'])
+def stop_recording():
+    """Save the recorded landmarks as an .npz sequence for replay"""
+    global recorder
+    # The worker only adds under recorder_lock, so once swapped out the
+    # recording is complete and can be saved without holding up inference
+    with recorder_lock:
+        current, recorder = recorder, None
+    if current is None:
+        return jsonify({'error': 'Not recording'}), 400
+    if not len(current):
+        return jsonify({'status': 'empty', 'frames': 0})
+    
+    os.makedirs(recording_dir, exist_ok=True)
+    path = os.path.join(recording_dir, time.strftime('landmarks-%Y%m%d-%H%M%S.npz'))
+    current.save(path)
+    return jsonify({'status': 'saved', 'frames': len(current), 'path': path})
+
 @app.route('/status', methods=['GET'])
 def get_status():
     return jsonify({
         'count': jumping_jacks_count,
-        'volume': get_volume(),
-        'tracking': is_tracking
+        'volume': volume.get(),
+        'tracking': is_tracking,
+        'viewers': len(broadcaster),
+        'stream_fps': round(stream_rate.rate(), 1),
+        'inference_fps': round(pose_worker.rate.rate(), 1),
+        'inference_ms': round(pose_worker.inference_ms, 1),
+        'pose_pool': pose_pool.stats(),
+        'ready': {
+            'model': model_ready.is_set(),
+            'model_error': model_error,
+            'camera': camera_source[0] if camera_source else None
+        }
     })
 
 if __name__ == '__main__':
+    # The reloader's watcher process never serves, so only warm up the child it runs
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_warm_up()
     app.run(debug=True, host='0.0.0.0', port=8000, threaded=True)
 
@@ -0,0 +1,87 @@
+"""Replay landmark sequences through JumpingJackDetector.
+
+With a recorded .npz file (from POST /recording/stop), prints the reps it
+contains. Without one, generates a synthetic workout, round-trips it through
+an .npz file and checks the count, exiting with an error on a mismatch.
+Either way, reports frames per second.
+
+Usage:
+    python bench_detector.py [recording.npz] [--frames 100000] [--reps-per-second 1.0]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from rep_detector import (ARM_THRESHOLD, LEFT_HIP, LEFT_SHOULDER, LEFT_WRIST, RIGHT_HIP,
+                          RIGHT_SHOULDER, RIGHT_WRIST, load_sequence, replay, save_sequence)
+
+
+def synthetic_workout(frames, fps=30.0, reps_per_second=1.0, noise=0.005, seed=0):
+    """Landmarks for someone doing jumping jacks at a steady pace.
+
+    Returns:
+        (timestamps, landmarks, expected reps)
+    """
+    rng = np.random.default_rng(seed)
+    t = np.arange(frames) / fps
+    landmarks = np.zeros((frames, 33, 4), dtype=np.float32)
+    landmarks[:, :, :2] = 0.5
+    landmarks[:, :, 3] = 1.0
+    landmarks[:, [LEFT_SHOULDER, RIGHT_SHOULDER], 1] = 0.35
+    landmarks[:, [LEFT_HIP, RIGHT_HIP], 1] = 0.65
+    # Wrists swing from well below to well above the shoulders
+    wrist_y = 0.35 - 0.25 * np.sin(2 * np.pi * reps_per_second * t - np.pi / 2)
+    landmarks[:, LEFT_WRIST, 1] = wrist_y
+    landmarks[:, RIGHT_WRIST, 1] = wrist_y
+    # A rep completes each time the wrists, having been raised past the
+    # threshold, drop past it below the shoulders: count those cycles in the
+    # noiseless signal
+    offset = wrist_y - 0.35
+    margin = ARM_THRESHOLD * 0.3  # Torso is 0.3 image heights
+    side = np.where(offset > margin, 1, np.where(offset < -margin, -1, 0))
+    side = side[side != 0]
+    expected = int(np.count_nonzero((side[:-1] == -1) & (side[1:] == 1)))
+
+    landmarks[:, :, :2] += rng.normal(0, noise, size=(frames, 33, 2))
+    return t, landmarks, expected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('recording', nargs='?', help='.npz landmark sequence to replay')
+    parser.add_argument('--frames', type=int, default=100000, help='Synthetic frames to generate')
+    parser.add_argument('--reps-per-second', type=float, default=1.0)
+    args = parser.parse_args()
+
+    expected = None
+    if args.recording:
+        timestamps, landmarks, aspect = load_sequence(args.recording)
+    else:
+        timestamps, landmarks, expected = synthetic_workout(args.frames,
+                                                            reps_per_second=args.reps_per_second)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'workout.npz')
+            save_sequence(path, timestamps, landmarks)
+            print(f"saved {len(landmarks)} frames in {os.path.getsize(path) / 1024:.0f} KiB")
+            timestamps, landmarks, aspect = load_sequence(path)
+
+    start = time.perf_counter()
+    reps = replay(landmarks, aspect)
+    elapsed = time.perf_counter() - start
+
+    print(f"frames={len(landmarks)} reps={len(reps)}"
+          + (f" expected={expected}" if expected is not None else ""))
+    print(f"{len(landmarks) / elapsed:,.0f} frames/s ({elapsed * 1e6 / max(1, len(landmarks)):.1f} us/frame)")
+    if reps:
+        times = timestamps[reps]
+        print(f"first rep at {times[0] - timestamps[0]:.2f}s, last at {times[-1] - timestamps[0]:.2f}s")
+    if expected is not None and len(reps) != expected:
+        raise SystemExit(f"MISMATCH: counted {len(reps)} reps, the synthetic workout has {expected}")
+
+
+if __name__ == '__main__':
+    main()
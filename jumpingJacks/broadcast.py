@@ -0,0 +1,137 @@
+"""Fan-out of encoded video frames to any number of viewers.
+
+One producer publishes each frame once. Every subscriber has a single
+latest-frame slot: publishing overwrites it, so a slow viewer skips frames
+instead of building up a queue, and memory stays constant per viewer.
+"""
+
+import itertools
+import threading
+
+from frame_rate import RateMeter
+
+_subscription_ids = itertools.count(1)
+
+
+class Subscription:
+    """One viewer's latest-frame slot."""
+
+    def __init__(self, broadcaster, profile=None, quality=None):
+        """
+        Args:
+            broadcaster: FrameBroadcaster this subscription belongs to
+            profile: Encoding profile the viewer asked for
+            quality: Current encoding quality; the viewer may change it
+        """
+        self.id = next(_subscription_ids)
+        self.profile = profile
+        self.quality = quality
+        self.frame_rate = RateMeter()
+        self.byte_rate = RateMeter()
+        self.bytes_sent = 0
+        self._broadcaster = broadcaster
+        self._cond = threading.Condition()
+        self._frame = None
+        self._seq = 0  # Sequence number of the frame in the slot
+        self._taken = 0  # Sequence number of the last frame returned
+        self.closed = False
+        self.delivered = 0
+        self.dropped = 0
+
+    def _offer(self, frame, seq):
+        with self._cond:
+            if self._seq > self._taken:
+                # The previous frame was never picked up
+                self.dropped += 1
+            self._frame = frame
+            self._seq = seq
+            self._cond.notify()
+
+    def _end(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        """Wait for a frame newer than the last one returned.
+
+        Returns:
+            The frame, or None on timeout or once the stream has ended
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._seq > self._taken or self.closed, timeout=timeout):
+                return None
+            if self._seq <= self._taken:
+                return None
+            self._taken = self._seq
+            self.delivered += 1
+            frame = self._frame
+        self.frame_rate.tick()
+        return frame
+
+    def sent(self, size):
+        """Record that size bytes were handed to the viewer's connection."""
+        self.bytes_sent += size
+        self.byte_rate.tick(size)
+
+    def close(self):
+        """Stop receiving frames."""
+        self._broadcaster._unsubscribe(self)
+        self._end()
+
+
+class FrameBroadcaster:
+    """Publishes each frame to every current subscriber's slot."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._seq = 0
+
+    def __len__(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def subscribe(self, profile=None, quality=None):
+        """Return a new Subscription that receives frames published from now on."""
+        subscription = Subscription(self, profile, quality)
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def _unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def subscriptions(self):
+        """Return the current subscriptions."""
+        with self._lock:
+            return list(self._subscribers)
+
+    def publish(self, frame):
+        """Hand a frame to every subscriber, replacing any frame they have not taken."""
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription._offer(frame, seq)
+
+    def publish_each(self, render):
+        """Publish a per-subscriber frame, render(subscription), skipping any that get None."""
+        with self._lock:
+            self._seq += 1
+            seq = self._seq
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            frame = render(subscription)
+            if frame is not None:
+                subscription._offer(frame, seq)
+
+    def end(self):
+        """Tell every current subscriber the stream has ended."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self._subscribers.clear()
+        for subscription in subscribers:
+            subscription._end()
@@ -0,0 +1,176 @@
+"""Count jumping jacks in a recorded video.
+
+The video is split into chunks that a process pool runs through MediaPipe
+in parallel, each worker with its own Pose graph. Every chunk starts a few
+seconds early so the pose tracker is warmed up by the time it reaches the
+frames the chunk owns; only owned frames are returned. The per-chunk
+landmarks are stitched back together in order and a single
+JumpingJackDetector runs over the whole sequence, so a rep that spans a
+chunk boundary is counted exactly once.
+
+Usage:
+    python count_video.py workout.mp4 [--workers N] [--chunk-seconds 20] [--overlap-seconds 2]
+                          [--every 1] [--model-complexity 1] [--save-landmarks out.npz] [--json]
+"""
+
+import argparse
+import atexit
+import json
+import multiprocessing
+import os
+import time
+
+import cv2
+import numpy as np
+
+from pose_pool import PosePool
+from rep_detector import landmarks_to_array, replay, save_sequence
+
+# Per worker process: one Pose graph reused (and reset) across the chunks it runs
+_pose_pool = None
+
+
+def video_info(path):
+    """Return (frame count, fps, width, height) of a video file."""
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError(f"Cannot open video: {path}")
+    try:
+        frames = int(capture.get(cv2.CAP_PROP_FRAME_COUNT))
+        fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+        width = int(capture.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(capture.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    finally:
+        capture.release()
+    return frames, fps, width, height
+
+
+def plan_chunks(frames, fps, chunk_seconds, overlap_seconds):
+    """Split [0, frames) into (warmup_start, start, end) chunks."""
+    size = max(1, int(chunk_seconds * fps))
+    overlap = int(overlap_seconds * fps)
+    return [(max(0, start - overlap), start, min(frames, start + size))
+            for start in range(0, frames, size)]
+
+
+def process_chunk(task):
+    """Worker: run pose estimation over one chunk.
+
+    Returns:
+        (start, landmarks for frames start..end with NaN where nobody was
+        found, frames run through the model)
+    """
+    global _pose_pool
+    import mediapipe as mp
+
+    path, warmup_start, start, end, every, model_complexity = task
+    if _pose_pool is None:
+        _pose_pool = PosePool(lambda: mp.solutions.pose.Pose(
+            model_complexity=model_complexity, min_detection_confidence=0.5, min_tracking_confidence=0.5))
+        atexit.register(_pose_pool.close)
+    landmarks = np.full((end - start, 33, 4), np.nan, dtype=np.float32)
+    capture = cv2.VideoCapture(path)
+    capture.set(cv2.CAP_PROP_POS_FRAMES, warmup_start)
+    inferred = 0
+    try:
+        # A new owner per chunk, so tracking from the previous chunk is reset
+        with _pose_pool.checkout(owner=start) as pose:
+            for index in range(warmup_start, end):
+                if (index - warmup_start) % every:
+                    # Skip decoding-to-image work for frames we do not look at
+                    if not capture.grab():
+                        break
+                    continue
+                success, frame = capture.read()
+                if not success:
+                    break
+                results = pose.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+                inferred += 1
+                if results.pose_landmarks and index >= start:
+                    landmarks[index - start] = landmarks_to_array(results.pose_landmarks.landmark)
+    finally:
+        capture.release()
+    return start, landmarks, inferred
+
+
+def count_video(path, workers=None, chunk_seconds=20.0, overlap_seconds=2.0, every=1,
+                model_complexity=1):
+    """Count the jumping jacks in a video file.
+
+    Args:
+        path: Video file
+        workers: Processes to use (default: one per CPU)
+        chunk_seconds: Length of video each task covers
+        overlap_seconds: Extra video before each chunk used to warm up tracking
+        every: Run the model on every Nth frame
+        model_complexity: MediaPipe Pose complexity, 0-2
+
+    Returns:
+        Dict with the total, per-rep timestamps and throughput figures
+    """
+    frames, fps, width, height = video_info(path)
+    chunks = plan_chunks(frames, fps, chunk_seconds, overlap_seconds)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(chunks)))
+    tasks = [(path, warmup, start, end, max(1, every), model_complexity) for warmup, start, end in chunks]
+
+    started = time.perf_counter()
+    landmarks = np.full((frames, 33, 4), np.nan, dtype=np.float32)
+    inferred = 0
+    # spawn, because MediaPipe's graph does not survive fork
+    with multiprocessing.get_context('spawn').Pool(workers) as pool:
+        for start, chunk, count in pool.imap_unordered(process_chunk, tasks):
+            landmarks[start:start + len(chunk)] = chunk
+            inferred += count
+        # Let workers exit normally so they close their Pose graphs
+        pool.close()
+        pool.join()
+    elapsed = time.perf_counter() - started
+
+    reps = replay(landmarks, aspect=width / height if height else 4 / 3)
+    return {
+        'video': path,
+        'frames': frames,
+        'fps': fps,
+        'total': len(reps),
+        'reps': [{'frame': int(i), 'time': round(i / fps, 3)} for i in reps],
+        'workers': workers,
+        'chunks': len(chunks),
+        'inferred_frames': inferred,
+        'elapsed_s': round(elapsed, 2),
+        'processed_fps': round(frames / elapsed, 1) if elapsed else 0.0,
+        'landmarks': landmarks
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('video', help='Video file to process')
+    parser.add_argument('--workers', type=int, default=None, help='Processes (default: one per CPU)')
+    parser.add_argument('--chunk-seconds', type=float, default=20.0)
+    parser.add_argument('--overlap-seconds', type=float, default=2.0)
+    parser.add_argument('--every', type=int, default=1, help='Run the model on every Nth frame')
+    parser.add_argument('--model-complexity', type=int, choices=(0, 1, 2), default=1)
+    parser.add_argument('--save-landmarks', help='Also save the landmarks as an .npz sequence')
+    parser.add_argument('--json', action='store_true', help='Print the result as JSON')
+    args = parser.parse_args()
+
+    result = count_video(args.video, args.workers, args.chunk_seconds, args.overlap_seconds,
+                         args.every, args.model_complexity)
+    landmarks = result.pop('landmarks')
+    if args.save_landmarks:
+        found = ~np.isnan(landmarks[:, 0, 0])
+        save_sequence(args.save_landmarks, np.flatnonzero(found) / result['fps'], landmarks[found])
+
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return
+
+    for number, rep in enumerate(result['reps'], 1):
+        print(f"rep {number:>4}  {rep['time']:8.2f}s  (frame {rep['frame']})")
+    print(f"total: {result['total']} jumping jacks")
+    print(f"{result['frames']} frames in {result['elapsed_s']}s with {result['workers']} workers "
+          f"({result['processed_fps']} frames/s, {result['chunks']} chunks)")
+
+
+if __name__ == '__main__':
+    main()
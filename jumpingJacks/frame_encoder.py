@@ -0,0 +1,111 @@
+"""JPEG encoding for the MJPEG stream, with per-viewer profiles.
+
+Viewers pick a resolution/quality profile. Each frame is encoded at most
+once per (profile, quality) pair that someone is actually watching, and a
+viewer whose connection cannot keep up is moved down a quality ladder until
+it stops dropping frames.
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+# Name -> (width, height, JPEG quality)
+PROFILES = {
+    'high': (640, 480, 85),
+    'medium': (480, 360, 70),
+    'low': (320, 240, 50),
+}
+DEFAULT_PROFILE = 'high'
+QUALITY_STEP = 15  # Quality change per adaptation step
+MIN_QUALITY = 25
+
+
+class AdaptiveQuality:
+    """Steps a viewer's JPEG quality down while it drops frames and back up once it keeps up."""
+
+    def __init__(self, quality, step=QUALITY_STEP, minimum=MIN_QUALITY, window=15,
+                 max_drop_ratio=0.2, recover_after=90):
+        """
+        Args:
+            quality: Best quality, used while the viewer keeps up
+            step: Quality change per adjustment (also keeps the set of
+                distinct qualities, and so encodes per frame, small)
+            minimum: Lowest quality to fall back to
+            window: Published frames (delivered or dropped) per decision
+            max_drop_ratio: Share of frames dropped in a window that counts as falling behind
+            recover_after: Delivered frames without drops before stepping back up
+        """
+        self.best = quality
+        self.step = step
+        self.minimum = minimum
+        self.window = window
+        self.max_drop_ratio = max_drop_ratio
+        self.recover_after = recover_after
+        self.quality = quality
+        self._delivered = 0
+        self._dropped = 0
+        self._clean = 0
+
+    def update(self, dropped):
+        """Report one delivered frame and how many were dropped before it. Returns the quality to use."""
+        self._delivered += 1
+        self._dropped += dropped
+        self._clean = 0 if dropped else self._clean + 1
+        if self._delivered + self._dropped < self.window:
+            return self.quality
+
+        if self._dropped / (self._delivered + self._dropped) > self.max_drop_ratio:
+            self.quality = max(self.minimum, self.quality - self.step)
+            self._clean = 0
+        elif self._clean >= self.recover_after and self.quality < self.best:
+            self.quality = min(self.best, self.quality + self.step)
+            self._clean = 0
+        self._delivered = self._dropped = 0
+        return self.quality
+
+
+class FrameEncoder:
+    """Encodes frames per profile, reusing resize buffers and timing each encode.
+
+    Used from the producer thread only.
+    """
+
+    def __init__(self, profiles=PROFILES):
+        self.profiles = profiles
+        self._buffers = {}  # Profile -> reusable resize target
+        self.encode_ms = {}  # Profile -> smoothed milliseconds per encode
+        self.frame_encode_ms = 0.0  # Total encode time for the last frame
+
+    def encode_all(self, frame, wanted):
+        """Encode a frame for each (profile, quality) pair in wanted.
+
+        Returns:
+            Dict of (profile, quality) -> JPEG bytes
+        """
+        encoded = {}
+        total = 0.0
+        for profile, quality in wanted:
+            start = time.perf_counter()
+            data = self.encode(frame, profile, quality)
+            total += time.perf_counter() - start
+            if data is not None:
+                encoded[(profile, quality)] = data
+        self.frame_encode_ms = total * 1000
+        return encoded
+
+    def encode(self, frame, profile, quality):
+        """Encode one frame at a profile's resolution and the given quality."""
+        width, height, _ = self.profiles[profile]
+        start = time.perf_counter()
+        if frame.shape[1] != width or frame.shape[0] != height:
+            buffer = self._buffers.get(profile)
+            if buffer is None or buffer.shape != (height, width) + frame.shape[2:]:
+                buffer = self._buffers[profile] = np.empty((height, width) + frame.shape[2:], dtype=frame.dtype)
+            frame = cv2.resize(frame, (width, height), dst=buffer, interpolation=cv2.INTER_AREA)
+        ret, data = cv2.imencode('.jpg', frame, (cv2.IMWRITE_JPEG_QUALITY, int(quality)))
+        elapsed = (time.perf_counter() - start) * 1000
+        previous = self.encode_ms.get(profile)
+        self.encode_ms[profile] = elapsed if previous is None else previous * 0.9 + elapsed * 0.1
+        return data.tobytes() if ret else None
@@ -0,0 +1,44 @@
+"""Sliding-window event rate, for frames and bytes per second figures."""
+
+import collections
+import threading
+import time
+
+
+class RateMeter:
+    """Counts events (or amounts, such as bytes) over the last few seconds."""
+
+    def __init__(self, window=2.0, clock=time.monotonic):
+        """
+        Args:
+            window: Seconds of history the rate is computed over
+            clock: Monotonic time source
+        """
+        self.window = window
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._times = collections.deque()  # (time, amount)
+        self._total = 0
+
+    def _trim(self, now):
+        while self._times and now - self._times[0][0] > self.window:
+            self._total -= self._times.popleft()[1]
+
+    def tick(self, amount=1):
+        """Record one event, or an amount such as a number of bytes."""
+        now = self.clock()
+        with self._lock:
+            self._times.append((now, amount))
+            self._total += amount
+            self._trim(now)
+
+    def rate(self):
+        """Return events (or amount) per second over the window."""
+        now = self.clock()
+        with self._lock:
+            self._trim(now)
+            if len(self._times) < 2:
+                return 0.0
+            span = now - self._times[0][0]
+            # The first event only marks the start of the span
+            return (self._total - self._times[0][1]) / span if span > 0 else 0.0
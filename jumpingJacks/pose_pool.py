@@ -0,0 +1,160 @@
+"""A bounded pool of pose estimators with checkout/return.
+
+MediaPipe's Pose graph is stateful and not safe to call from two threads at
+once, and building one takes a while. The pool creates estimators on demand
+up to a fixed size and hands each to one caller at a time. An estimator's
+tracking state belongs to the stream (owner) that last used it: checking
+out prefers the estimator that owner had before, and one coming from
+another owner is reset first so it does not track a person from a
+different stream. How long callers wait for an estimator is measured, to
+size the pool for the number of concurrent streams.
+"""
+
+import collections
+import contextlib
+import threading
+import time
+
+
+class _Slot:
+    """One estimator and the owner whose tracking state it holds."""
+
+    def __init__(self, estimator):
+        self.estimator = estimator
+        self.owner = None
+        self.stale = False  # Reset before the next use
+
+
+class PosePool:
+    """Hands out at most size estimators, one caller at a time each."""
+
+    def __init__(self, factory, size=1, clock=time.monotonic):
+        """
+        Args:
+            factory: Callable returning a new estimator, e.g. a mediapipe Pose
+            size: Most estimators that will exist at once
+            clock: Monotonic time source for the wait metric
+        """
+        self.factory = factory
+        self.size = max(1, int(size))
+        self.clock = clock
+        self._cond = threading.Condition()
+        self._idle = []  # Slots ready for checkout
+        self._slots = {}  # id(estimator) -> slot, for every estimator created
+        self._creating = 0  # Estimators being built outside the lock
+        self._in_use = 0
+        self._waiting = 0
+        self._checkouts = 0
+        self._waits = collections.deque(maxlen=100)  # Seconds waited, recent checkouts
+        self._max_wait = 0.0
+
+    def acquire(self, owner=None, timeout=None):
+        """Check out an estimator, waiting for one to be returned if the pool is full.
+
+        Args:
+            owner: Key of the stream the frames come from, e.g. a camera or a
+                video chunk; tracking state is not carried across owners
+            timeout: Seconds to wait, or None to wait indefinitely
+
+        Returns:
+            The estimator; give it back with release()
+
+        Raises:
+            TimeoutError: No estimator became free within timeout
+        """
+        start = self.clock()
+        with self._cond:
+            self._waiting += 1
+            try:
+                ready = self._cond.wait_for(
+                    lambda: self._idle or len(self._slots) + self._creating < self.size, timeout=timeout)
+                if not ready:
+                    raise TimeoutError(f"No pose estimator free after {timeout}s")
+            finally:
+                self._waiting -= 1
+            slot = self._take(owner)
+            if slot is None:
+                self._creating += 1
+            self._in_use += 1
+
+        if slot is None:
+            try:
+                slot = _Slot(self.factory())
+            except BaseException:
+                with self._cond:
+                    self._creating -= 1
+                    self._in_use -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._creating -= 1
+                self._slots[id(slot.estimator)] = slot
+        elif slot.stale or slot.owner != owner:
+            # Its tracking state refers to another stream (or a stopped one)
+            if hasattr(slot.estimator, 'reset'):
+                slot.estimator.reset()
+        slot.owner = owner
+        slot.stale = False
+
+        waited = self.clock() - start
+        with self._cond:
+            self._checkouts += 1
+            self._waits.append(waited)
+            self._max_wait = max(self._max_wait, waited)
+        return slot.estimator
+
+    def _take(self, owner):
+        # Prefer the estimator that already tracks this owner
+        for i, slot in enumerate(self._idle):
+            if slot.owner == owner:
+                return self._idle.pop(i)
+        if len(self._slots) + self._creating < self.size:
+            return None
+        return self._idle.pop(0)
+
+    def release(self, estimator):
+        """Return an estimator checked out with acquire()."""
+        with self._cond:
+            self._idle.append(self._slots[id(estimator)])
+            self._in_use -= 1
+            self._cond.notify()
+
+    @contextlib.contextmanager
+    def checkout(self, owner=None, timeout=None):
+        """Context manager around acquire() and release()."""
+        estimator = self.acquire(owner, timeout)
+        try:
+            yield estimator
+        finally:
+            self.release(estimator)
+
+    def reset(self, owner=None):
+        """Drop tracking state for owner's estimators, or all of them, before their next use."""
+        with self._cond:
+            for slot in self._slots.values():
+                if owner is None or slot.owner == owner:
+                    slot.stale = True
+
+    def stats(self):
+        """Return pool occupancy and how long recent checkouts waited."""
+        with self._cond:
+            waits = list(self._waits)
+            return {
+                'size': self.size,
+                'created': len(self._slots),
+                'in_use': self._in_use,
+                'waiting': self._waiting,
+                'checkouts': self._checkouts,
+                'wait_ms': round(sum(waits) / len(waits) * 1000, 2) if waits else 0.0,
+                'max_wait_ms': round(self._max_wait * 1000, 2)
+            }
+
+    def close(self):
+        """Close every idle estimator; the pool builds new ones if used again."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            for slot in idle:
+                del self._slots[id(slot.estimator)]
+        for slot in idle:
+            if hasattr(slot.estimator, 'close'):
+                slot.estimator.close()
@@ -0,0 +1,121 @@
+"""Pose inference on its own thread, decoupled from the video stream.
+
+The capture loop submits frames without waiting. The worker always runs on
+the most recent one (frames that arrive while it is busy are skipped), can
+be limited to every Nth frame or a maximum rate, and keeps the last two
+results so the stream can draw landmarks projected to the current frame's
+capture time.
+"""
+
+import collections
+import threading
+import time
+
+from frame_rate import RateMeter
+
+
+class PoseWorker:
+    """Runs a pose estimator on the latest submitted frame."""
+
+    def __init__(self, estimate, on_result=None, every=1, max_fps=0.0, clock=time.monotonic):
+        """
+        Args:
+            estimate: Callable taking an RGB frame and returning a (33, 4)
+                landmark array, or None when no person is found
+            on_result: Called as on_result(points, ts, frame) on the worker
+                thread after each inference, in capture order
+            every: Only consider every Nth submitted frame
+            max_fps: Most inferences per second, or 0 for no limit
+            clock: Monotonic time source, matching the submitted timestamps
+        """
+        self.estimate = estimate
+        self.on_result = on_result
+        self.every = max(1, int(every))
+        self.max_fps = max_fps
+        self.clock = clock
+        self.rate = RateMeter(clock=clock)
+        self.inference_ms = 0.0
+        self._cond = threading.Condition()
+        self._frame = None  # Latest (frame, ts) waiting for inference
+        self._submitted = 0
+        self._history = collections.deque(maxlen=2)  # (ts, points or None)
+        self._epoch = 0  # Bumped by reset() so in-flight results are discarded
+        self._thread = threading.Thread(target=self._run, name='pose-worker', daemon=True)
+        self._thread.start()
+
+    def submit(self, frame, ts):
+        """Offer a frame for inference. Returns True if it was taken.
+
+        The worker holds on to the frame, so pass one that will not be drawn on.
+        """
+        with self._cond:
+            self._submitted += 1
+            if self._submitted % self.every:
+                return False
+            self._frame = (frame, ts)
+            self._cond.notify()
+        return True
+
+    def reset(self):
+        """Forget previous results, e.g. when tracking stops."""
+        with self._cond:
+            self._frame = None
+            self._history.clear()
+            self._epoch += 1
+
+    def landmarks(self, ts=None, interpolate=True):
+        """Return the most recent landmarks as a (33, 4) array, or None.
+
+        Args:
+            ts: Capture time of the frame they will be drawn on
+            interpolate: Project the last two results linearly to ts, at most
+                one inference interval ahead
+        """
+        with self._cond:
+            history = list(self._history)
+        if not history or history[-1][1] is None:
+            return None
+        t1, p1 = history[-1]
+        if not interpolate or ts is None or len(history) < 2 or history[0][1] is None:
+            return p1
+        t0, p0 = history[0]
+        if t1 <= t0:
+            return p1
+        progress = min(max((ts - t1) / (t1 - t0), 0.0), 1.0)
+        projected = p1 + (p1 - p0) * progress
+        projected[:, 3] = p1[:, 3]  # Visibility is not extrapolated
+        return projected
+
+    def _run(self):
+        next_allowed = 0.0
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._frame is not None)
+                if self.max_fps:
+                    delay = next_allowed - self.clock()
+                    if delay > 0:
+                        # Wait out the rate limit; newer frames replace this one meanwhile
+                        self._cond.wait(delay)
+                        continue
+                (frame, ts), self._frame = self._frame, None
+                epoch = self._epoch
+
+            start = self.clock()
+            next_allowed = start + (1.0 / self.max_fps if self.max_fps else 0.0)
+            try:
+                points = self.estimate(frame)
+            except Exception as e:
+                print(f"Error estimating pose: {e}")
+                continue
+            self.inference_ms = (self.clock() - start) * 1000
+            self.rate.tick()
+
+            with self._cond:
+                if epoch != self._epoch:
+                    continue
+                self._history.append((ts, points))
+            if points is not None and self.on_result:
+                try:
+                    self.on_result(points, ts, frame)
+                except Exception as e:
+                    print(f"Error handling pose result: {e}")
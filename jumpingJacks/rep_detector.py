@@ -0,0 +1,147 @@
+"""Jumping jack counting over pose landmark arrays.
+
+Landmarks are a (33, 4) float array per frame: MediaPipe's normalized x, y,
+z and visibility for each of its 33 pose points. Thresholds are scaled by
+the person's torso length, so counting does not depend on the camera
+resolution or how far away the person stands. Sequences can be saved to
+and replayed from .npz files, which lets the counting logic be tested and
+benchmarked without a camera or MediaPipe.
+"""
+
+import numpy as np
+
+# MediaPipe PoseLandmark indices
+LEFT_SHOULDER, RIGHT_SHOULDER = 11, 12
+LEFT_WRIST, RIGHT_WRIST = 15, 16
+LEFT_HIP, RIGHT_HIP = 23, 24
+
+ARM_THRESHOLD = 0.15  # Wrist distance above/below the shoulder, in torso lengths
+
+
+def landmarks_to_array(landmarks):
+    """Convert MediaPipe landmarks to a (33, 4) array of x, y, z, visibility."""
+    return np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in landmarks], dtype=np.float32)
+
+
+class JumpingJackDetector:
+    """Counts a rep each time both arms go up above the shoulders and come back down."""
+
+    def __init__(self, threshold=ARM_THRESHOLD):
+        """
+        Args:
+            threshold: How far past the shoulder a wrist must be, in torso lengths
+        """
+        self.threshold = threshold
+        self.reset()
+
+    def reset(self):
+        self.primed = False
+        self.left_arm_up = False
+        self.right_arm_up = False
+        self.left_arm_down = False
+        self.right_arm_down = False
+        self.count = 0
+
+    def update(self, points, aspect=4 / 3):
+        """Advance the state machine by one frame.
+
+        Args:
+            points: (33, 4) landmark array in normalized image coordinates
+            aspect: Image width / height, to measure the torso in square units
+
+        Returns:
+            Dict of the arm flags plus 'rep', True if this frame completed a rep
+        """
+        # Torso length in units of image height
+        shoulders = (points[LEFT_SHOULDER, :2] + points[RIGHT_SHOULDER, :2]) / 2
+        hips = (points[LEFT_HIP, :2] + points[RIGHT_HIP, :2]) / 2
+        torso = float(np.hypot((hips[0] - shoulders[0]) * aspect, hips[1] - shoulders[1]))
+        margin = self.threshold * torso
+
+        left = points[LEFT_WRIST, 1] - points[LEFT_SHOULDER, 1]
+        right = points[RIGHT_WRIST, 1] - points[RIGHT_SHOULDER, 1]
+
+        rep = False
+        if self.primed and torso > 0:
+            # y grows downwards, so a raised wrist has a negative offset
+            if left < -margin and not self.left_arm_up:
+                self.left_arm_up = True
+                self.left_arm_down = False
+            if left > margin and self.left_arm_up and not self.left_arm_down:
+                self.left_arm_down = True
+
+            if right < -margin and not self.right_arm_up:
+                self.right_arm_up = True
+                self.right_arm_down = False
+            if right > margin and self.right_arm_up and not self.right_arm_down:
+                self.right_arm_down = True
+
+            if self.left_arm_up and self.right_arm_up and self.left_arm_down and self.right_arm_down:
+                rep = True
+                self.count += 1
+                self.left_arm_up = False
+                self.right_arm_up = False
+                self.left_arm_down = False
+                self.right_arm_down = False
+        self.primed = True
+
+        return {
+            'left_arm_up': self.left_arm_up,
+            'right_arm_up': self.right_arm_up,
+            'left_arm_down': self.left_arm_down,
+            'right_arm_down': self.right_arm_down,
+            'rep': rep
+        }
+
+
+class LandmarkRecorder:
+    """Collects (timestamp, landmarks) frames for saving as a sequence."""
+
+    def __init__(self, aspect=4 / 3):
+        self.aspect = aspect
+        self.timestamps = []
+        self.frames = []
+
+    def __len__(self):
+        return len(self.frames)
+
+    def add(self, ts, points):
+        self.timestamps.append(ts)
+        self.frames.append(np.asarray(points, dtype=np.float32))
+
+    def save(self, path):
+        """Write the sequence to a compressed .npz file."""
+        save_sequence(path, self.timestamps, self.frames, self.aspect)
+
+
+def save_sequence(path, timestamps, frames, aspect=4 / 3):
+    """Save landmark frames as timestamps (n,), landmarks (n, 33, 4) and aspect.
+
+    Landmarks are stored as float16, precise to about 1/2000 of the image.
+    """
+    landmarks = np.asarray(frames, dtype=np.float16).reshape(-1, 33, 4)
+    np.savez_compressed(path, timestamps=np.asarray(timestamps, dtype=np.float64),
+                        landmarks=landmarks, aspect=np.float64(aspect))
+
+
+def load_sequence(path):
+    """Load a sequence saved by save_sequence.
+
+    Returns:
+        (timestamps, landmarks, aspect)
+    """
+    with np.load(path) as data:
+        return data['timestamps'], data['landmarks'].astype(np.float32), float(data['aspect'])
+
+
+def replay(landmarks, aspect=4 / 3, detector=None):
+    """Run a detector over a landmark sequence.
+
+    Frames filled with NaN (no person found) are skipped, as they are live.
+
+    Returns:
+        Indices of the frames that completed a rep
+    """
+    detector = detector or JumpingJackDetector()
+    return [i for i, points in enumerate(landmarks)
+            if not np.isnan(points[0, 0]) and detector.update(points, aspect)['rep']]
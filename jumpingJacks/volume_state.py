@@ -0,0 +1,77 @@
+"""Cached system volume for Jumping Jacks.
+
+The video loop draws the volume on every frame and every rep changes it, but
+each osascript call forks a process. VolumeState keeps the authoritative
+level in memory: local changes update it immediately and are written to the
+system by a background thread, which also re-reads the system volume at a
+low rate to pick up changes made elsewhere. Readers never block on a
+subprocess.
+"""
+
+import threading
+
+
+class VolumeState:
+    """In-memory volume level kept in sync with the system in the background."""
+
+    def __init__(self, reader, writer, refresh_interval=5.0, default=50):
+        """
+        Args:
+            reader: Callable returning the system volume (0-100)
+            writer: Callable setting the system volume
+            refresh_interval: Seconds between background reads of the system volume
+            default: Level reported until the first read completes
+        """
+        self.reader = reader
+        self.writer = writer
+        self.refresh_interval = refresh_interval
+        self._cond = threading.Condition()
+        self._level = default
+        self._pending = None  # Level waiting to be written
+        self._generation = 0  # Bumped by local changes so stale reads are discarded
+        self.reads = 0
+        self.writes = 0
+        self._thread = threading.Thread(target=self._run, name='volume-sync', daemon=True)
+        self._thread.start()
+
+    def get(self):
+        """Return the current level without touching the system."""
+        with self._cond:
+            return self._level
+
+    def set(self, level):
+        """Set the level now; the system is written in the background."""
+        level = max(0, min(100, int(level)))
+        with self._cond:
+            self._level = level
+            self._pending = level
+            self._generation += 1
+            self._cond.notify()
+        return level
+
+    def _run(self):
+        refresh = True  # Read the real level straight away
+        while True:
+            with self._cond:
+                if not refresh:
+                    self._cond.wait_for(lambda: self._pending is not None, timeout=self.refresh_interval)
+                pending, self._pending = self._pending, None
+                generation = self._generation
+
+            try:
+                if pending is not None:
+                    # Only the latest of several quick changes is written
+                    self.writer(pending)
+                    self.writes += 1
+                    refresh = False
+                    continue
+
+                level = int(self.reader())
+                self.reads += 1
+                with self._cond:
+                    # Ignore the read if the level was changed locally meanwhile
+                    if generation == self._generation:
+                        self._level = max(0, min(100, level))
+            except Exception as e:
+                print(f"Error syncing volume: {e}")
+            refresh = False
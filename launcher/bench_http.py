@@ -0,0 +1,413 @@
+"""HTTP load and latency benchmark for the volume games.
+
+Starts the launcher's combined app in a child process, with the osascript
+volume helpers replaced by an in-memory fake and the Jumping Jacks camera by
+a synthetic frame source. It then drives a mix of simulated players against
+it over real HTTP and reports requests/sec and latency percentiles per
+endpoint as JSON.
+
+Traffic mix (per simulated client):
+    roulette       polls /api/volume/current, spins in bursts, reads stats
+    whack          starts a game, polls /grid, whacks visible moles in bursts
+    jumping-jacks  polls /status; a few clients also watch /video_feed
+
+Usage:
+    python bench_http.py [--duration 10] [--roulette 20] [--whack 20] [--jumping-jacks 5]
+                         [--viewers 1] [--server waitress|dev] [--threads 32]
+                         [--backend-latency 0.0] [--think 1.0]
+                         [--output results.json] [--baseline previous.json]
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import multiprocessing
+import os
+import random
+import sys
+import threading
+import time
+
+HOST = '127.0.0.1'
+
+
+class SyntheticCamera:
+    """cv2.VideoCapture stand-in producing paced frames with a moving block."""
+
+    def __init__(self, width=640, height=480, fps=30.0):
+        import numpy as np
+        self.width = width
+        self.height = height
+        self.interval = 1.0 / fps
+        self._next = time.monotonic()
+        self._tick = 0
+        self._np = np
+
+    def isOpened(self):
+        return True
+
+    def set(self, prop, value):
+        return True
+
+    def read(self):
+        # Pace like a real camera
+        delay = self._next - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        self._next = max(self._next + self.interval, time.monotonic())
+
+        np = self._np
+        frame = np.full((self.height, self.width, 3), 40, dtype=np.uint8)
+        x = (self._tick * 8) % (self.width - 80)
+        frame[200:280, x:x + 80] = (0, 200, 255)
+        self._tick += 1
+        return True, frame
+
+    def release(self):
+        pass
+
+
+def install_fakes(module, volume):
+    """Point a game module's volume helpers and camera at the fakes."""
+    for name in ('get_current_volume', 'get_volume'):
+        if hasattr(module, name):
+            setattr(module, name, volume.get)
+    if hasattr(module, 'set_volume'):
+        setattr(module, 'set_volume', volume.set)
+    if hasattr(module, 'open_camera'):
+        setattr(module, 'open_camera', SyntheticCamera)
+
+
+def run_server(names, server, threads, backend_latency, ready):
+    """Child process: build the combined app with fakes and serve it."""
+    # Keep benchmark rounds and spins out of the real history files
+    os.environ['WHACK_LEADERBOARD_DB'] = ''
+    os.environ['ROULETTE_SPIN_LOG'] = ''
+    # The report goes to the parent's stdout, so keep app messages off it
+    sys.stdout = sys.stderr
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import serve
+    sys.path.insert(0, os.path.join(serve.ROOT, 'whackAVolume'))
+    from fake_volume import FakeVolume
+
+    application = serve.build_app(names)
+    volume = FakeVolume(latency=backend_latency)
+    mounted = []
+    for prefix, (_, module_name) in serve.APPS.items():
+        if module_name in sys.modules:
+            install_fakes(sys.modules[module_name], volume)
+            mounted.append(prefix)
+
+    if server == 'dev':
+        from werkzeug.serving import make_server
+        # Per-request logging would dominate the measurement
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        httpd = make_server(HOST, 0, application, threaded=True)
+        ready.put((httpd.server_port, mounted))
+        httpd.serve_forever()
+    else:
+        from waitress import create_server
+        httpd = create_server(application, host=HOST, port=0, threads=threads,
+                              connection_limit=1000)
+        ready.put((httpd.effective_port, mounted))
+        httpd.run()
+
+
+class Recorder:
+    """Latency samples and error counts per endpoint for one client thread."""
+
+    def __init__(self):
+        self.samples = {}
+        self.errors = {}
+
+    def add(self, name, seconds):
+        self.samples.setdefault(name, []).append(seconds)
+
+    def error(self, name):
+        self.errors[name] = self.errors.get(name, 0) + 1
+
+
+class Client:
+    """Keep-alive HTTP client with a cookie jar, timing every request."""
+
+    def __init__(self, port, recorder):
+        self.port = port
+        self.recorder = recorder
+        self.cookies = {}
+        self.conn = http.client.HTTPConnection(HOST, port, timeout=30)
+
+    def request(self, method, path, body=None, headers=None, name=None):
+        """Send a request and return (status, headers, body), or None on failure."""
+        name = name or f'{method} {path.split("?")[0]}'
+        headers = dict(headers or {})
+        if body is not None:
+            body = json.dumps(body)
+            headers['Content-Type'] = 'application/json'
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f'{k}={v}' for k, v in self.cookies.items())
+
+        start = time.perf_counter()
+        try:
+            self.conn.request(method, path, body=body, headers=headers)
+            response = self.conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            self.recorder.error(name)
+            self.conn.close()
+            self.conn = http.client.HTTPConnection(HOST, self.port, timeout=30)
+            return None
+        self.recorder.add(name, time.perf_counter() - start)
+
+        if response.status >= 500:
+            self.recorder.error(name)
+        for header in response.headers.get_all('Set-Cookie') or ():
+            key, _, value = header.split(';', 1)[0].partition('=')
+            self.cookies[key.strip()] = value.strip()
+        if response.will_close:
+            self.conn.close()
+            self.conn = http.client.HTTPConnection(HOST, self.port, timeout=30)
+        return response.status, response.headers, data
+
+    def close(self):
+        self.conn.close()
+
+
+def pause(rng, seconds, think, deadline):
+    """Sleep for a jittered think time, but not past the deadline."""
+    if think:
+        time.sleep(max(0.0, min(rng.uniform(0.5, 1.5) * seconds * think, deadline - time.monotonic())))
+
+
+def roulette_player(client, deadline, rng, think):
+    """Poll the volume like the page does and spin now and then."""
+    client.request('GET', '/roulette/')
+    while time.monotonic() < deadline:
+        client.request('GET', '/roulette/api/volume/current')
+        if rng.random() < 0.2:
+            for _ in range(rng.randint(1, 3)):
+                client.request('POST', '/roulette/api/roulette/play', body={})
+        if rng.random() < 0.05:
+            client.request('GET', '/roulette/api/roulette/stats')
+        pause(rng, 2.0, think, deadline)
+
+
+def whack_player(client, deadline, rng, think):
+    """Play rounds: poll the grid and whack whatever moles are up."""
+    client.request('GET', '/whack/')
+    client.request('POST', '/whack/start')
+    etag = None
+    polls = 0
+    while time.monotonic() < deadline:
+        headers = {'If-None-Match': etag} if etag else {}
+        result = client.request('GET', '/whack/grid', headers=headers)
+        polls += 1
+        if result and result[0] == 200:
+            status, response_headers, body = result
+            etag = response_headers.get('ETag')
+            moles = json.loads(body)['moles']
+            for mole in moles:
+                client.request('POST', '/whack/hit', body={'row': mole['row'], 'col': mole['col']})
+        if polls % 4 == 0:
+            client.request('GET', '/whack/status')
+        pause(rng, 0.25, think, deadline)
+    client.request('POST', '/whack/stop', body={'name': 'bench'})
+
+
+def jumping_jacks_poller(client, deadline, rng, think):
+    """Poll the counter like the page does."""
+    client.request('GET', '/jumping-jacks/')
+    client.request('POST', '/jumping-jacks/start')
+    while time.monotonic() < deadline:
+        client.request('GET', '/jumping-jacks/status')
+        pause(rng, 0.5, think, deadline)
+
+
+def jumping_jacks_viewer(port, deadline, streams):
+    """Watch the MJPEG feed, counting frames."""
+    name = 'GET /jumping-jacks/video_feed'
+    conn = http.client.HTTPConnection(HOST, port, timeout=30)
+    start = time.perf_counter()
+    frames = 0
+    first_frame = None
+    try:
+        conn.request('GET', '/jumping-jacks/video_feed')
+        response = conn.getresponse()
+        tail = b''
+        while time.monotonic() < deadline:
+            chunk = response.read1(65536)
+            if not chunk:
+                break
+            data = tail + chunk
+            count = data.count(b'--frame')
+            if count and first_frame is None:
+                first_frame = time.perf_counter() - start
+            frames += count
+            tail = data[-8:]
+    except (OSError, http.client.HTTPException):
+        pass
+    finally:
+        conn.close()
+    streams.append({'name': name, 'frames': frames, 'seconds': time.perf_counter() - start,
+                    'first_frame': first_frame})
+
+
+def percentile(ordered, pct):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def summarize(recorders, streams, elapsed):
+    """Merge per-thread samples into the JSON report."""
+    samples = {}
+    errors = {}
+    for recorder in recorders:
+        for name, values in recorder.samples.items():
+            samples.setdefault(name, []).extend(values)
+        for name, count in recorder.errors.items():
+            errors[name] = errors.get(name, 0) + count
+
+    endpoints = {}
+    for name in sorted(set(samples) | set(errors)):
+        ordered = sorted(samples.get(name, ()))
+        endpoints[name] = {
+            'requests': len(ordered),
+            'errors': errors.get(name, 0),
+            'rps': round(len(ordered) / elapsed, 1),
+            'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3) if ordered else 0.0,
+            'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+            'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+            'max_ms': round(ordered[-1] * 1000, 3) if ordered else 0.0
+        }
+
+    report_streams = {}
+    for stream in streams:
+        entry = report_streams.setdefault(stream['name'], {'viewers': 0, 'frames': 0, 'fps': 0.0,
+                                                           'first_frame_ms': None})
+        entry['viewers'] += 1
+        entry['frames'] += stream['frames']
+        if stream['first_frame'] is not None:
+            first = round(stream['first_frame'] * 1000, 1)
+            entry['first_frame_ms'] = max(entry['first_frame_ms'] or 0.0, first)
+    for name, entry in report_streams.items():
+        entry['fps'] = round(entry['frames'] / entry['viewers'] / elapsed, 1)
+
+    total = sum(e['requests'] for e in endpoints.values())
+    return {
+        'elapsed_s': round(elapsed, 2),
+        'total': {'requests': total, 'errors': sum(errors.values()), 'rps': round(total / elapsed, 1)},
+        'endpoints': endpoints,
+        'streams': report_streams
+    }
+
+
+def compare(report, baseline):
+    """Print per-endpoint throughput and p99 changes against a previous report."""
+    print(f"{'endpoint':<40} {'rps':>10} {'Δrps':>8} {'p99 ms':>10} {'Δp99':>8}", file=sys.stderr)
+    for name, now in report['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(name)
+        if not before:
+            print(f"{name:<40} {now['rps']:>10} {'new':>8} {now['p99_ms']:>10} {'new':>8}", file=sys.stderr)
+            continue
+        d_rps = (now['rps'] / before['rps'] - 1) * 100 if before['rps'] else 0.0
+        d_p99 = (now['p99_ms'] / before['p99_ms'] - 1) * 100 if before['p99_ms'] else 0.0
+        print(f"{name:<40} {now['rps']:>10} {d_rps:>+7.1f}% {now['p99_ms']:>10} {d_p99:>+7.1f}%",
+              file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run')
+    parser.add_argument('--roulette', type=int, default=20, help='Simulated Roulette clients')
+    parser.add_argument('--whack', type=int, default=20, help='Simulated Whack-A-Volume players')
+    parser.add_argument('--jumping-jacks', type=int, default=5, help='Simulated Jumping Jacks pages')
+    parser.add_argument('--viewers', type=int, default=1, help='Clients watching the video feed')
+    parser.add_argument('--server', choices=('waitress', 'dev'), default='waitress')
+    parser.add_argument('--threads', type=int, default=32, help='Server worker threads (waitress)')
+    parser.add_argument('--backend-latency', type=float, default=0.0,
+                        help='Seconds each fake volume call takes (osascript is ~0.02-0.05)')
+    parser.add_argument('--think', type=float, default=1.0,
+                        help='Scale for client think times; 0 sends requests back to back')
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--output', help='Write the JSON report here instead of stdout')
+    parser.add_argument('--baseline', help='Previous JSON report to compare against')
+    args = parser.parse_args()
+
+    wanted = [name for name, count in (('roulette', args.roulette), ('whack', args.whack),
+                                       ('jumping-jacks', args.jumping_jacks + args.viewers))
+              if count]
+
+    ctx = multiprocessing.get_context('spawn')
+    ready = ctx.Queue()
+    server = ctx.Process(target=run_server, daemon=True,
+                         args=(None, args.server, args.threads, args.backend_latency, ready))
+    server.start()
+    port, mounted = ready.get(timeout=60)
+    missing = [name for name in wanted if name not in mounted]
+    if missing:
+        print(f"Not benchmarking {', '.join(missing)}: app could not be loaded", file=sys.stderr)
+
+    rng = random.Random(args.seed)
+    profiles = []
+    if 'roulette' in mounted:
+        profiles += [roulette_player] * args.roulette
+    if 'whack' in mounted:
+        profiles += [whack_player] * args.whack
+    if 'jumping-jacks' in mounted:
+        profiles += [jumping_jacks_poller] * args.jumping_jacks
+
+    recorders = []
+    streams = []
+    deadline = time.monotonic() + args.duration
+    threads = []
+    for profile in profiles:
+        recorder = Recorder()
+        recorders.append(recorder)
+        client_rng = random.Random(rng.random())
+
+        def run(profile=profile, client=Client(port, recorder), client_rng=client_rng):
+            try:
+                profile(client, deadline, client_rng, args.think)
+            finally:
+                client.close()
+
+        threads.append(threading.Thread(target=run, daemon=True))
+    if 'jumping-jacks' in mounted:
+        threads += [threading.Thread(target=jumping_jacks_viewer, args=(port, deadline, streams),
+                                     daemon=True) for _ in range(args.viewers)]
+
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(args.duration + 30)
+    elapsed = time.perf_counter() - started
+    server.terminate()
+
+    report = summarize(recorders, streams, elapsed)
+    report['config'] = {
+        'server': args.server,
+        'threads': args.threads,
+        'duration': args.duration,
+        'clients': {'roulette': args.roulette, 'whack': args.whack,
+                    'jumping_jacks': args.jumping_jacks, 'viewers': args.viewers},
+        'mounted': mounted,
+        'backend_latency': args.backend_latency,
+        'think': args.think
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(report, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
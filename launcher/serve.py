@@ -0,0 +1,119 @@
+"""Serve every volume game from one process on a production WSGI server.
+
+Each game's app.py is loaded as-is and mounted under its own path prefix
+(/roulette/, /whack/, /jumping-jacks/, /sixeven/). Every app keeps its own
+module, globals and background threads, so their state stays isolated.
+
+Usage:
+    python serve.py [--host HOST] [--port PORT] [--threads N] [--apps roulette,whack]
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+
+from werkzeug.middleware.dispatcher import DispatcherMiddleware
+from werkzeug.utils import redirect
+from werkzeug.wrappers import Response
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Path prefix -> (directory, module name to load its app.py as)
+APPS = {
+    'roulette': ('Roulette', 'roulette_app'),
+    'whack': ('whackAVolume', 'whack_app'),
+    'jumping-jacks': ('jumpingJacks', 'jumping_jacks_app'),
+    'sixeven': ('sixeven', 'sixeven_app'),
+}
+
+
+def load_app(directory, module_name):
+    """Import directory/app.py under module_name and return its Flask app."""
+    app_dir = os.path.join(ROOT, directory)
+    # Each app imports its helper modules (board, simulation, ...) by bare name
+    if app_dir not in sys.path:
+        sys.path.insert(0, app_dir)
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(app_dir, 'app.py'))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        del sys.modules[module_name]
+        raise
+    return module.app
+
+
+def index_page(prefixes):
+    """WSGI app listing the mounted games."""
+    links = ''.join(f'<li><a href="/{prefix}/">{prefix}</a></li>' for prefix in prefixes)
+    body = f'<!DOCTYPE html><html><head><title>Volume Games</title></head><body><h1>Volume Games</h1><ul>{links}</ul></body></html>'
+
+    def app(environ, start_response):
+        if environ.get('PATH_INFO', '') not in ('', '/'):
+            return Response('Not Found', status=404)(environ, start_response)
+        return Response(body, mimetype='text/html')(environ, start_response)
+
+    return app
+
+
+def build_app(names=None):
+    """Build the combined WSGI app.
+
+    Args:
+        names: Prefixes to mount, or None for every app that imports cleanly
+
+    Returns:
+        WSGI application
+    """
+    explicit = names is not None
+    mounts = {}
+    for name in (names if explicit else APPS):
+        if name not in APPS:
+            raise ValueError(f"Unknown app '{name}'; choose from {', '.join(APPS)}")
+        directory, module_name = APPS[name]
+        try:
+            mounts[f'/{name}'] = load_app(directory, module_name)
+        except ImportError as e:
+            if explicit:
+                raise
+            # e.g. jumpingJacks without OpenCV/MediaPipe installed
+            print(f"Skipping {name}: {e}")
+
+    dispatcher = DispatcherMiddleware(index_page([prefix.lstrip('/') for prefix in mounts]), mounts)
+
+    def application(environ, start_response):
+        path = environ.get('PATH_INFO', '')
+        if path in mounts:
+            # Bare prefix: add the slash so the page's relative URLs resolve under it
+            query = environ.get('QUERY_STRING')
+            return redirect(path + '/' + (f'?{query}' if query else ''), code=308)(environ, start_response)
+        return dispatcher(environ, start_response)
+
+    return application
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve all volume games from one process')
+    parser.add_argument('--host', default=os.environ.get('VOLUME_HOST', '0.0.0.0'))
+    parser.add_argument('--port', type=int, default=int(os.environ.get('VOLUME_PORT', 8080)))
+    parser.add_argument('--threads', type=int, default=int(os.environ.get('VOLUME_THREADS', 32)),
+                        help='Worker threads; every open event stream or video feed holds one')
+    parser.add_argument('--apps', help=f"Comma-separated subset of {','.join(APPS)}")
+    args = parser.parse_args()
+
+    from waitress import serve
+
+    names = args.apps.split(',') if args.apps else None
+    application = build_app(names)
+    print(f"Serving on http://{args.host}:{args.port}/ with {args.threads} threads")
+    # A small output buffer makes slow video viewers block (and so skip frames)
+    # instead of waitress buffering up to 16 MB per connection
+    serve(application, host=args.host, port=args.port, threads=args.threads,
+          connection_limit=max(100, args.threads * 4), channel_timeout=300,
+          outbuf_high_watermark=1024 * 1024)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,12 +1,128 @@
-from flask import Flask, render_template
+from flask import Flask, render_template, jsonify, request, url_for
+import collections
+import hashlib
+import os
+import threading
+
+from seesaw import SeesawDetector, validate_hands
+from vendor_assets import ONE_YEAR, PACKAGES, VendorAssets, cdn_url
 
 app = Flask(__name__)
 
+# Server-side gesture engines, one per client session; the least recently used go first
+max_sessions = 100
+max_batch_frames = 600  # ~20 seconds at 30fps per request
+sessions = collections.OrderedDict()  # session id -> (SeesawDetector, lock)
+sessions_lock = threading.Lock()
+
+# MediaPipe files served from static/vendor (see vendor_assets.py), else from the CDN
+vendor = VendorAssets()
+
+# Content hashes of our own static files, keyed by path: (mtime, hash)
+static_versions = {}
+
+def get_session(session_id):
+    """Return the detector and lock for a session, creating them if needed"""
+    with sessions_lock:
+        if session_id in sessions:
+            sessions.move_to_end(session_id)
+        else:
+            sessions[session_id] = (SeesawDetector(), threading.Lock())
+            while len(sessions) > max_sessions:
+                sessions.popitem(last=False)
+        return sessions[session_id]
+
+def static_version(filename):
+    """Short content hash of a static file, recomputed when it changes"""
+    path = os.path.join(app.static_folder, filename)
+    mtime = os.path.getmtime(path)
+    cached = static_versions.get(filename)
+    if cached is None or cached[0] != mtime:
+        with open(path, 'rb') as f:
+            cached = (mtime, hashlib.sha256(f.read()).hexdigest()[:12])
+        static_versions[filename] = cached
+    return cached[1]
+
+def vendor_files(package):
+    """Map each file of a MediaPipe package to the URL to load it from"""
+    urls = {}
+    for filename in PACKAGES[package][1]:
+        path = vendor.path(package, filename)
+        urls[filename] = url_for('vendor_file', filename=path) if path else cdn_url(package, filename)
+    return urls
+
+@app.context_processor
+def asset_helpers():
+    return {
+        'static_url': lambda filename: url_for('static', filename=filename, v=static_version(filename)),
+        'vendor_files': vendor_files
+    }
+
+@app.after_request
+def cache_static(response):
+    """Let browsers keep fingerprinted static files without revalidating"""
+    version = request.args.get('v')
+    if request.endpoint == 'static' and version and response.status_code == 200:
+        if version == static_version(request.view_args['filename']):
+            response.cache_control.no_cache = None
+            response.cache_control.max_age = ONE_YEAR
+            response.cache_control.public = True
+            response.cache_control.immutable = True
+    return response
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
-if __name__ == '__main__':
-    app.run(debug=True, host='0.0.0.0', port=3000)
+@app.route('/vendor/<path:filename>')
+def vendor_file(filename):
+    """Serve a vendored MediaPipe file by its hashed name"""
+    return vendor.send(filename)
+
+@app.route('/api/landmarks', methods=['POST'])
+def ingest_landmarks():
+    """Run a batch of hand landmark frames through the session's gesture engine"""
+    data = request.get_json(silent=True) or {}
+    session_id = str(data.get('session') or 'default')
+    frames = data.get('frames')
+    if not isinstance(frames, list):
+        return jsonify({'error': 'frames must be a list of {"hands": [...]} objects'}), 400
+    if len(frames) > max_batch_frames:
+        return jsonify({'error': f'At most {max_batch_frames} frames per batch'}), 400
 
+    # Check the whole batch first, so a bad frame never leaves it half applied
+    batch = []
+    for frame in frames:
+        try:
+            if not isinstance(frame, dict):
+                raise ValueError('Each frame must be a {"hands": [...]} object')
+            hands = frame.get('hands') or []
+            if not isinstance(hands, list):
+                raise ValueError('hands must be a list')
+            validate_hands(hands)
+        except ValueError as e:
+            return jsonify({'error': str(e), 'frame': len(batch)}), 400
+        batch.append(hands)
 
+    detector, lock = get_session(session_id)
+    detected = []
+    message = None
+    with lock:
+        if data.get('reset'):
+            detector.reset()
+        for hands in batch:
+            hit, message = detector.update(hands)
+            detected.append(hit)
+        zero_crossings, amplitude = detector.zero_crossings, detector.amplitude
+
+    return jsonify({
+        'session': session_id,
+        'frames': len(frames),
+        'detected': detected,
+        'status': message,
+        'zero_crossings': zero_crossings,
+        'amplitude': round(amplitude, 4)
+    })
+
+if __name__ == '__main__':
+    app.run(debug=True, host='0.0.0.0', port=3000)
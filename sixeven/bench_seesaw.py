@@ -0,0 +1,105 @@
+"""Benchmark the incremental seesaw detector against a full rescan per frame.
+
+Replays a recorded landmark stream, in the same JSON format as the body
+POSTed to /api/landmarks ({"frames": [{"hands": [...]}, ...]}), or a
+synthetic one. Both detectors must agree on every frame; the report shows
+frames per second and per-frame cost for each window size.
+
+Usage:
+    python bench_seesaw.py [--stream recording.json] [--frames 20000] [--windows 30 120 480]
+"""
+
+import argparse
+import json
+import math
+import random
+import time
+
+from seesaw import DETECTED, MOVING, NOT_DETECTED, PALMS_DOWN, WAITING, WRIST, SeesawDetector, is_palm_up, replay
+
+
+def synthetic_stream(frames=20000, fps=30, seed=0):
+    """Two palm-up hands seesawing in bursts, with pauses and dropouts."""
+    rng = random.Random(seed)
+    stream = []
+    for i in range(frames):
+        t = i / fps
+        if (t % 10) > 8.5:
+            stream.append({'hands': []})  # Hands out of view
+            continue
+        moving = (t % 10) < 6
+        offset = 0.12 * math.sin(2 * math.pi * 1.5 * t) if moving else 0.0
+        hands = []
+        for x, y in ((0.3, 0.5 + offset), (0.7, 0.5 - offset)):
+            y += rng.gauss(0, 0.005)
+            hand = [[x, y + 0.1 * (j > 0), 0.0] for j in range(21)]
+            hand[WRIST] = [x, y, 0.0]
+            for knuckle in (5, 9):
+                hand[knuckle] = [x, y - 0.08, 0.0]  # Knuckles above the wrist: palm up
+            hands.append(hand)
+        stream.append({'hands': hands})
+    return stream
+
+
+class RescanDetector:
+    """The original algorithm: rescan the whole history on every frame."""
+
+    def __init__(self, window=30):
+        self.window = window
+        self.history = []
+
+    def update(self, hands):
+        if len(hands) < 2:
+            self.history.clear()
+            return False, WAITING
+        first, second = hands[0], hands[1]
+        left, right = (first, second) if first[WRIST][0] < second[WRIST][0] else (second, first)
+        if not (is_palm_up(left) and is_palm_up(right)):
+            return False, PALMS_DOWN
+        self.history.append((left[WRIST][1], right[WRIST][1]))
+        if len(self.history) > self.window:
+            self.history.pop(0)
+        if len(self.history) < 10:
+            return False, MOVING
+
+        signs = [1 if l - r >= 0 else -1 for l, r in self.history]
+        crossings = sum(1 for a, b in zip(signs, signs[1:]) if a != b)
+        amplitude = max(max(h) for h in self.history) - min(min(h) for h in self.history)
+        opposite = sum(1 for (l0, r0), (l1, r1) in zip(self.history, self.history[1:])
+                       if (l1 - l0 > 0 and r1 - r0 < 0) or (l1 - l0 < 0 and r1 - r0 > 0))
+        detected = crossings >= 2 and amplitude > 0.05 and opposite > len(self.history) * 0.3
+        return detected, DETECTED if detected else NOT_DETECTED
+
+
+def run(detector, stream):
+    start = time.perf_counter()
+    results = [detector.update(frame['hands']) for frame in stream]
+    return results, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--stream', help='Recorded landmark stream (JSON)')
+    parser.add_argument('--frames', type=int, default=20000, help='Synthetic stream length')
+    parser.add_argument('--windows', type=int, nargs='+', default=[30, 120, 480])
+    args = parser.parse_args()
+
+    if args.stream:
+        with open(args.stream) as f:
+            stream = json.load(f)['frames']
+    else:
+        stream = synthetic_stream(args.frames)
+    detections = sum(detected for detected, _ in replay(stream))
+    print(f"{len(stream)} frames, {detections} detected with the default window")
+
+    for window in args.windows:
+        fast, fast_s = run(SeesawDetector(window=window), stream)
+        slow, slow_s = run(RescanDetector(window=window), stream)
+        mismatches = sum(a != b for a, b in zip(fast, slow))
+        print(f"window {window:>4}: incremental {len(stream) / fast_s:>9.0f} frames/s "
+              f"({fast_s / len(stream) * 1e6:.1f} us), rescan {len(stream) / slow_s:>9.0f} frames/s "
+              f"({slow_s / len(stream) * 1e6:.1f} us), mismatches: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
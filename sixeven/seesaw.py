@@ -0,0 +1,208 @@
+"""Six-seven (seesaw) gesture detection with constant work per frame.
+
+Mirrors the detector in static/js/detector.js. The last `window` frames of
+wrist heights live in a ring buffer. Everything the seesaw check needs is
+kept up to date as a frame enters or leaves the window, instead of
+rescanning the window on every frame:
+
+- zero crossings and opposite-motion counts, as one flag per pair of
+  consecutive frames (added when a frame arrives, removed when its
+  predecessor leaves);
+- the lowest and highest wrist, as monotonic queues whose front is the
+  current minimum / maximum.
+
+Hands are lists of 21 MediaPipe landmarks, each a dict with x, y and z or
+an (x, y, z) sequence, in normalized image coordinates.
+"""
+
+import collections
+
+# MediaPipe Hands landmark indices
+WRIST, INDEX_MCP, MIDDLE_MCP = 0, 5, 9
+
+WAITING = 'Waiting for both hands...'
+PALMS_DOWN = 'Palms should face upward'
+MOVING = 'Moving hands...'
+DETECTED = 'SIX-SEVEN DETECTED!'
+NOT_DETECTED = 'Make seesaw motion...'
+
+
+def _xyz(landmark):
+    if isinstance(landmark, dict):
+        return float(landmark['x']), float(landmark['y']), float(landmark.get('z', 0.0))
+    return float(landmark[0]), float(landmark[1]), float(landmark[2]) if len(landmark) > 2 else 0.0
+
+
+def validate_hands(hands):
+    """Check that update() can read every hand it may look at.
+
+    Raises:
+        ValueError: A hand is not a landmark list with usable wrist and knuckles
+    """
+    try:
+        for hand in hands[:2]:
+            for index in (WRIST, INDEX_MCP, MIDDLE_MCP):
+                _xyz(hand[index])
+    except (IndexError, KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Each hand must be a list of 21 landmarks with x, y and z ({e!r})") from e
+
+
+def is_palm_up(hand):
+    """Whether the wrist is below the index and middle finger knuckles."""
+    wrist_y = _xyz(hand[WRIST])[1]
+    knuckles_y = (_xyz(hand[INDEX_MCP])[1] + _xyz(hand[MIDDLE_MCP])[1]) / 2
+    return wrist_y > knuckles_y
+
+
+class _MonotonicQueue:
+    """Sliding-window extreme: the front is the best value still in the window."""
+
+    def __init__(self, better):
+        self.better = better  # better(a, b) is True if a should stay in front of b
+        self._items = collections.deque()  # (seq, value), values ordered by better
+
+    def clear(self):
+        self._items.clear()
+
+    def push(self, seq, value):
+        while self._items and not self.better(self._items[-1][1], value):
+            self._items.pop()
+        self._items.append((seq, value))
+
+    def expire(self, oldest_seq):
+        """Drop values from frames before oldest_seq."""
+        while self._items and self._items[0][0] < oldest_seq:
+            self._items.popleft()
+
+    def front(self):
+        return self._items[0][1]
+
+
+class SeesawDetector:
+    """Detects hands moving alternately up and down over a sliding window of frames."""
+
+    def __init__(self, window=30, min_history=10, min_zero_crossings=2, min_amplitude=0.05,
+                 min_opposite_ratio=0.3):
+        """
+        Args:
+            window: Frames of history considered (~1 second at 30fps)
+            min_history: Frames needed before anything is detected
+            min_zero_crossings: Times the hands must swap which is higher
+            min_amplitude: Vertical range the wrists must cover, normalized
+            min_opposite_ratio: Share of frames where the hands move in opposite directions
+        """
+        self.window = window
+        self.min_history = min_history
+        self.min_zero_crossings = min_zero_crossings
+        self.min_amplitude = min_amplitude
+        self.min_opposite_ratio = min_opposite_ratio
+        self._left = [0.0] * window
+        self._right = [0.0] * window
+        self._crossing = [0] * window  # Relative position changed sign since the previous frame
+        self._opposite = [0] * window  # Hands moved in opposite directions since the previous frame
+        self._lowest = _MonotonicQueue(lambda a, b: a < b)
+        self._highest = _MonotonicQueue(lambda a, b: a > b)
+        self.reset()
+
+    def reset(self):
+        """Forget the history, e.g. when a hand leaves the frame."""
+        self._start = 0
+        self.length = 0
+        self._seq = 0  # Frames pushed since the last reset
+        self.zero_crossings = 0
+        self.opposite_motion = 0
+        self._lowest.clear()
+        self._highest.clear()
+
+    @property
+    def amplitude(self):
+        """Vertical range covered by the wrists in the window."""
+        if not self.length:
+            return 0.0
+        return self._highest.front() - self._lowest.front()
+
+    def push(self, left_y, right_y):
+        """Add one frame's wrist heights and return whether the gesture is detected."""
+        if self.length == self.window:
+            self._evict()
+
+        slot = (self._start + self.length) % self.window
+        if self.length:
+            prev = (slot - 1) % self.window
+            crossing = (left_y - right_y >= 0) != (self._left[prev] - self._right[prev] >= 0)
+            left_delta = left_y - self._left[prev]
+            right_delta = right_y - self._right[prev]
+            opposite = (left_delta > 0 and right_delta < 0) or (left_delta < 0 and right_delta > 0)
+        else:
+            crossing = opposite = False
+        self._left[slot] = left_y
+        self._right[slot] = right_y
+        self._crossing[slot] = int(crossing)
+        self._opposite[slot] = int(opposite)
+        self.zero_crossings += crossing
+        self.opposite_motion += opposite
+        self.length += 1
+
+        self._lowest.push(self._seq, min(left_y, right_y))
+        self._highest.push(self._seq, max(left_y, right_y))
+        self._seq += 1
+        return self.detected()
+
+    def _evict(self):
+        self._start = (self._start + 1) % self.window
+        self.length -= 1
+        # The new oldest frame's flags compared it with the frame that just left
+        self.zero_crossings -= self._crossing[self._start]
+        self.opposite_motion -= self._opposite[self._start]
+        oldest_seq = self._seq - self.length
+        self._lowest.expire(oldest_seq)
+        self._highest.expire(oldest_seq)
+
+    def detected(self):
+        """Whether the current window shows the seesaw gesture."""
+        if self.length < self.min_history:
+            return False
+        return (self.zero_crossings >= self.min_zero_crossings
+                and self.amplitude > self.min_amplitude
+                and self.opposite_motion > self.length * self.min_opposite_ratio)
+
+    def update(self, hands):
+        """Process one frame of detected hands.
+
+        Args:
+            hands: Hand landmark lists found in the frame
+
+        Returns:
+            (detected, status message for the user)
+        """
+        if len(hands) < 2:
+            self.reset()
+            return False, WAITING
+
+        # Left is the hand further left in the image
+        first, second = hands[0], hands[1]
+        if _xyz(first[WRIST])[0] < _xyz(second[WRIST])[0]:
+            left, right = first, second
+        else:
+            left, right = second, first
+        if not (is_palm_up(left) and is_palm_up(right)):
+            return False, PALMS_DOWN
+
+        detected = self.push(_xyz(left[WRIST])[1], _xyz(right[WRIST])[1])
+        if self.length < self.min_history:
+            return False, MOVING
+        return detected, DETECTED if detected else NOT_DETECTED
+
+
+def replay(frames, detector=None):
+    """Run a recorded stream through a detector.
+
+    Args:
+        frames: Sequence of frames, each a dict with a 'hands' list
+        detector: SeesawDetector to continue, or None for a new one
+
+    Returns:
+        List of (detected, message), one per frame
+    """
+    detector = detector or SeesawDetector()
+    return [detector.update(frame.get('hands') or []) for frame in frames]
@@ -9,14 +9,135 @@ let camera;
 let isDetected = false;
 
 // Gesture tracking variables
-const motionHistory = [];
 const maxHistoryLength = 30; // ~1 second at 30fps
+const minHistoryLength = 10;
+
+// Sliding-window minimum or maximum over frame sequence numbers. The front is
+// always the extreme still in the window, and every value enters and leaves
+// at most once, so each frame costs O(1) on average.
+class MonotonicQueue {
+    constructor(capacity, better) {
+        this.capacity = capacity + 1;
+        this.better = better; // better(a, b) is true if a should stay in front of b
+        this.seqs = new Float64Array(this.capacity);
+        this.values = new Float64Array(this.capacity);
+        this.clear();
+    }
+    
+    clear() {
+        this.head = 0;
+        this.tail = 0;
+    }
+    
+    push(seq, value) {
+        while (this.head !== this.tail) {
+            const last = (this.tail + this.capacity - 1) % this.capacity;
+            if (this.better(this.values[last], value)) break;
+            this.tail = last;
+        }
+        this.seqs[this.tail] = seq;
+        this.values[this.tail] = value;
+        this.tail = (this.tail + 1) % this.capacity;
+    }
+    
+    expire(oldestSeq) {
+        while (this.head !== this.tail && this.seqs[this.head] < oldestSeq) {
+            this.head = (this.head + 1) % this.capacity;
+        }
+    }
+    
+    front() {
+        return this.values[this.head];
+    }
+}
+
+// Last maxHistoryLength wrist heights in a ring buffer. Zero crossings and
+// opposite-motion counts are kept as one flag per pair of consecutive frames,
+// added when a frame arrives and removed when its predecessor leaves, so the
+// seesaw check never rescans the window. Same engine as sixeven/seesaw.py.
+class SeesawWindow {
+    constructor(size) {
+        this.size = size;
+        this.leftY = new Float64Array(size);
+        this.rightY = new Float64Array(size);
+        this.crossing = new Uint8Array(size); // Relative position changed sign since the previous frame
+        this.opposite = new Uint8Array(size); // Hands moved in opposite directions since the previous frame
+        this.lowest = new MonotonicQueue(size, (a, b) => a < b);
+        this.highest = new MonotonicQueue(size, (a, b) => a > b);
+        this.clear();
+    }
+    
+    clear() {
+        this.start = 0;
+        this.length = 0;
+        this.seq = 0; // Frames pushed since the last clear
+        this.zeroCrossings = 0;
+        this.oppositeMotion = 0;
+        this.lowest.clear();
+        this.highest.clear();
+    }
+    
+    amplitude() {
+        return this.length ? this.highest.front() - this.lowest.front() : 0;
+    }
+    
+    push(leftY, rightY) {
+        if (this.length === this.size) {
+            this.evict();
+        }
+        
+        const slot = (this.start + this.length) % this.size;
+        let crossing = 0;
+        let opposite = 0;
+        if (this.length) {
+            const prev = (slot + this.size - 1) % this.size;
+            crossing = (leftY - rightY >= 0) !== (this.leftY[prev] - this.rightY[prev] >= 0) ? 1 : 0;
+            const leftDelta = leftY - this.leftY[prev];
+            const rightDelta = rightY - this.rightY[prev];
+            // If one hand moves up and the other moves down
+            opposite = (leftDelta > 0 && rightDelta < 0) || (leftDelta < 0 && rightDelta > 0) ? 1 : 0;
+        }
+        this.leftY[slot] = leftY;
+        this.rightY[slot] = rightY;
+        this.crossing[slot] = crossing;
+        this.opposite[slot] = opposite;
+        this.zeroCrossings += crossing;
+        this.oppositeMotion += opposite;
+        this.length++;
+        
+        this.lowest.push(this.seq, Math.min(leftY, rightY));
+        this.highest.push(this.seq, Math.max(leftY, rightY));
+        this.seq++;
+    }
+    
+    evict() {
+        this.start = (this.start + 1) % this.size;
+        this.length--;
+        // The new oldest frame's flags compared it with the frame that just left
+        this.zeroCrossings -= this.crossing[this.start];
+        this.oppositeMotion -= this.opposite[this.start];
+        const oldestSeq = this.seq - this.length;
+        this.lowest.expire(oldestSeq);
+        this.highest.expire(oldestSeq);
+    }
+}
+
+const motionHistory = new SeesawWindow(maxHistoryLength);
+
+// Optional server-side mirror (?server=1): landmark frames are sent in batches
+// to the same engine in sixeven/seesaw.py, e.g. to record or compare streams
+const serverMirror = new URLSearchParams(window.location.search).has('server');
+const serverBatchSize = 15;
+const serverSession = Math.random().toString(36).slice(2);
+let serverFrames = [];
+let serverReset = true;
 
 // Initialize MediaPipe Hands
 function initializeHands() {
     hands = new Hands({
         locateFile: (file) => {
-            return `https://cdn.jsdelivr.net/npm/@mediapipe/hands/${file}`;
+            // Hashed, long-cached copies from the app when vendored; see vendor_assets.py
+            return window.HANDS_FILES[file] || `https://cdn.jsdelivr.net/npm/@mediapipe/hands/${file}`;
         }
     });
     
@@ -50,13 +171,17 @@ function onResults(results) {
     
     // Detect gesture
     detectSixSevenGesture(results);
+    
+    if (serverMirror) {
+        mirrorToServer(results);
+    }
 }
 
 // Main gesture detection function
 function detectSixSevenGesture(results) {
     if (!results.multiHandLandmarks || results.multiHandLandmarks.length < 2) {
         // Need both hands
-        motionHistory.length = 0;
+        motionHistory.clear();
         updateDetectionStatus(false, 'Waiting for both hands...');
         return;
     }
@@ -80,22 +205,11 @@ function detectSixSevenGesture(results) {
     const leftWristY = hands.left[0].y;
     const rightWristY = hands.right[0].y;
     
-    // Store current hand positions
-    const currentState = {
-        leftY: leftWristY,
-        rightY: rightWristY,
-        timestamp: Date.now()
-    };
-    
-    motionHistory.push(currentState);
-    
-    // Keep only recent history
-    if (motionHistory.length > maxHistoryLength) {
-        motionHistory.shift();
-    }
+    // Store current hand positions; the oldest drops out of the window
+    motionHistory.push(leftWristY, rightWristY);
     
     // Need enough history to detect pattern
-    if (motionHistory.length < 10) {
+    if (motionHistory.length < minHistoryLength) {
         updateDetectionStatus(false, 'Moving hands...');
         return;
     }
@@ -148,28 +262,7 @@ function isPalmUp(landmarks) {
 
 // Detect seesaw pattern (alternating up/down motion)
 function detectSeesawPattern(history) {
-    if (history.length < 10) return false;
-    
-    // Calculate relative positions (left hand relative to right hand)
-    const relativePositions = history.map(state => state.leftY - state.rightY);
-    
-    // Check for alternating pattern
-    // Count zero-crossings (when relative position changes sign)
-    let zeroCrossings = 0;
-    let lastSign = relativePositions[0] >= 0 ? 1 : -1;
-    
-    for (let i = 1; i < relativePositions.length; i++) {
-        const currentSign = relativePositions[i] >= 0 ? 1 : -1;
-        if (currentSign !== lastSign) {
-            zeroCrossings++;
-            lastSign = currentSign;
-        }
-    }
-    
-    // Check motion amplitude (hands should move significantly)
-    const minY = Math.min(...history.map(h => Math.min(h.leftY, h.rightY)));
-    const maxY = Math.max(...history.map(h => Math.max(h.leftY, h.rightY)));
-    const amplitude = maxY - minY;
+    if (history.length < minHistoryLength) return false;
     
     // Detection criteria:
     // - At least 2 zero-crossings (alternating motion)
@@ -177,26 +270,38 @@ function detectSeesawPattern(history) {
     const minZeroCrossings = 2;
     const minAmplitude = 0.05; // Minimum movement in normalized coordinates
     
-    const hasAlternatingMotion = zeroCrossings >= minZeroCrossings;
-    const hasEnoughMovement = amplitude > minAmplitude;
-    
-    // Additional check: verify hands are moving in opposite directions
-    let oppositeMotionCount = 0;
-    for (let i = 1; i < history.length; i++) {
-        const leftDelta = history[i].leftY - history[i-1].leftY;
-        const rightDelta = history[i].rightY - history[i-1].rightY;
-        
-        // If one hand moves up and the other moves down
-        if ((leftDelta > 0 && rightDelta < 0) || (leftDelta < 0 && rightDelta > 0)) {
-            oppositeMotionCount++;
-        }
-    }
+    const hasAlternatingMotion = history.zeroCrossings >= minZeroCrossings;
+    const hasEnoughMovement = history.amplitude() > minAmplitude;
     
-    const hasOppositeMotion = oppositeMotionCount > history.length * 0.3; // At least 30% of frames
+    // Additional check: hands moving in opposite directions
+    const hasOppositeMotion = history.oppositeMotion > history.length * 0.3; // At least 30% of frames
     
     return hasAlternatingMotion && hasEnoughMovement && hasOppositeMotion;
 }
 
+// Queue a frame for the server-side engine and send full batches
+function mirrorToServer(results) {
+    const hands = (results.multiHandLandmarks || []).map(
+        landmarks => landmarks.map(({ x, y, z }) => [x, y, z]));
+    serverFrames.push({ hands });
+    if (serverFrames.length < serverBatchSize) return;
+    
+    const body = JSON.stringify({ session: serverSession, reset: serverReset, frames: serverFrames });
+    serverFrames = [];
+    serverReset = false;
+    fetch('api/landmarks', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body
+    }).then(response => response.json())
+      .then(data => {
+          if (data.detected && data.detected[data.detected.length - 1] !== isDetected) {
+              console.warn('Server engine disagrees with the page:', data.status);
+          }
+      })
+      .catch(error => console.error('Error mirroring landmarks:', error));
+}
+
 // Update detection status UI
 function updateDetectionStatus(detected, message) {
     statusText.textContent = message;
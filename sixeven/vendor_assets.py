@@ -0,0 +1,201 @@
+"""Vendored MediaPipe assets: fetch, fingerprint, precompress and serve them.
+
+Run as a script to download the pinned MediaPipe packages the page uses into
+static/vendor. Every file is stored under a content-hashed name, together
+with gzip (and, if the brotli package is installed, brotli) variants and a
+manifest.json. Because a hashed URL never changes meaning, the app serves
+these files with a one-year immutable cache policy: warm page loads take
+them straight from the browser cache without asking the server.
+
+Usage:
+    python vendor_assets.py                  # download from the CDN
+    python vendor_assets.py --from ./mediapipe   # use files already on disk, laid out as <package>/<file>
+"""
+
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import urllib.request
+
+from flask import abort, request, send_file
+
+try:
+    import brotli
+except ImportError:  # Optional: only gzip variants are built without it
+    brotli = None
+
+VENDOR_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static', 'vendor')
+MANIFEST = 'manifest.json'
+CDN = 'https://cdn.jsdelivr.net/npm/@mediapipe'
+ONE_YEAR = 365 * 24 * 60 * 60
+
+# Pinned package versions and the files the page loads from each
+PACKAGES = {
+    'hands': ('0.4.1675469240', [
+        'hands.js',
+        'hands.binarypb',
+        'hands_solution_packed_assets.data',
+        'hands_solution_packed_assets_loader.js',
+        'hands_solution_simd_wasm_bin.js',
+        'hands_solution_simd_wasm_bin.wasm',
+        'hands_solution_wasm_bin.js',
+        'hands_solution_wasm_bin.wasm',
+        'hand_landmark_full.tflite',
+        'hand_landmark_lite.tflite'
+    ]),
+    'camera_utils': ('0.3.1675466862', ['camera_utils.js']),
+    'drawing_utils': ('0.3.1675466124', ['drawing_utils.js'])
+}
+
+# Preferred first; (Accept-Encoding token, file suffix)
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+MIMETYPES = {
+    '.js': 'text/javascript',
+    '.wasm': 'application/wasm',
+    '.data': 'application/octet-stream',
+    '.binarypb': 'application/octet-stream',
+    '.tflite': 'application/octet-stream'
+}
+
+
+def cdn_url(package, filename):
+    """URL of a file of a pinned package on the CDN."""
+    return f"{CDN}/{package}@{PACKAGES[package][0]}/{filename}"
+
+
+class VendorAssets:
+    """Looks up and serves the files listed in a vendor manifest."""
+
+    def __init__(self, directory=VENDOR_DIR):
+        """
+        Args:
+            directory: Where vendor_assets.py put the files and manifest.json
+        """
+        self.directory = directory
+        self.files = {}  # Hashed path -> manifest entry
+        self.paths = {}  # 'package/file' -> hashed path
+        try:
+            with open(os.path.join(directory, MANIFEST)) as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return
+        for name, entry in manifest['files'].items():
+            self.paths[name] = entry['path']
+            self.files[entry['path']] = entry
+
+    def path(self, package, filename):
+        """Hashed path of a vendored file, or None if it was not vendored."""
+        return self.paths.get(f"{package}/{filename}")
+
+    def send(self, path):
+        """Respond with a vendored file, precompressed if the client accepts it.
+
+        ETag, If-None-Match and Range are handled by send_file; range
+        requests always get the uncompressed bytes.
+        """
+        entry = self.files.get(path)
+        if entry is None:
+            abort(404)
+
+        encoding = suffix = None
+        if 'Range' not in request.headers:
+            for token, variant in ENCODINGS:
+                if token in entry['encodings'] and request.accept_encodings[token]:
+                    encoding, suffix = token, variant
+                    break
+
+        file_path = os.path.join(self.directory, path) + (suffix or '')
+        etag = entry['sha256'][:16] + (f"-{encoding}" if encoding else '')
+        response = send_file(file_path, mimetype=MIMETYPES.get(os.path.splitext(path)[1]),
+                             conditional=True, etag=etag, max_age=ONE_YEAR)
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+
+def build(sources, directory=VENDOR_DIR):
+    """Write hashed files, their compressed variants and the manifest.
+
+    Args:
+        sources: Dict of 'package/file' -> file contents
+        directory: Output directory
+
+    Returns:
+        The manifest
+    """
+    files = {}
+    for name, data in sorted(sources.items()):
+        digest = hashlib.sha256(data).hexdigest()
+        root, ext = os.path.splitext(name)
+        path = f"{root}.{digest[:12]}{ext}"
+        target = os.path.join(directory, path)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        with open(target, 'wb') as f:
+            f.write(data)
+
+        variants = {'gzip': gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants['br'] = brotli.compress(data, quality=11)
+        encodings = {}
+        for token, suffix in ENCODINGS:
+            compressed = variants.get(token)
+            # Models barely compress; only keep variants that save something
+            if compressed is not None and len(compressed) < len(data) * 0.9:
+                with open(target + suffix, 'wb') as f:
+                    f.write(compressed)
+                encodings[token] = len(compressed)
+        files[name] = {'path': path, 'sha256': digest, 'size': len(data), 'encodings': encodings}
+
+    # Drop files from previous versions
+    keep = {entry['path'] + suffix for entry in files.values() for suffix in ('', '.gz', '.br')}
+    for package in PACKAGES:
+        for root, _, names in os.walk(os.path.join(directory, package)):
+            for filename in names:
+                relative = os.path.relpath(os.path.join(root, filename), directory).replace(os.sep, '/')
+                if relative not in keep:
+                    os.remove(os.path.join(root, filename))
+
+    manifest = {'packages': {package: version for package, (version, _) in PACKAGES.items()}, 'files': files}
+    with open(os.path.join(directory, MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def fetch(source_dir=None):
+    """Read every pinned file, from source_dir/<package>/<file> or the CDN."""
+    sources = {}
+    for package, (_, filenames) in PACKAGES.items():
+        for filename in filenames:
+            if source_dir:
+                with open(os.path.join(source_dir, package, filename), 'rb') as f:
+                    data = f.read()
+            else:
+                print(f"Downloading {cdn_url(package, filename)}")
+                with urllib.request.urlopen(cdn_url(package, filename), timeout=60) as response:
+                    data = response.read()
+            sources[f"{package}/{filename}"] = data
+    return sources
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Vendor the MediaPipe assets the page loads')
+    parser.add_argument('--from', dest='source_dir', help='Use files laid out as <package>/<file> instead of downloading')
+    parser.add_argument('--output', default=VENDOR_DIR, help='Directory to write to')
+    args = parser.parse_args()
+
+    manifest = build(fetch(args.source_dir), args.output)
+    raw = sum(entry['size'] for entry in manifest['files'].values())
+    smallest = sum(min([entry['size'], *entry['encodings'].values()]) for entry in manifest['files'].values())
+    print(f"Vendored {len(manifest['files'])} files into {args.output}: "
+          f"{raw / 1e6:.1f} MB, {smallest / 1e6:.1f} MB compressed"
+          + ('' if brotli else ' (pip install brotli for .br variants)'))
+
+
+if __name__ == '__main__':
+    main()
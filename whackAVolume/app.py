@@ -1,31 +1,60 @@
-from flask import Flask, render_template, jsonify, request
-import random
+from flask import Flask, render_template, jsonify, request, Response, g
+import atexit
+import json
+import os
+import re
+import secrets
 import subprocess
-import threading
-import time
+
+from board import MoleBoard
+from game import Game, GameRegistry
+from leaderboard import Leaderboard
+from scheduler import Scheduler
+from volume_model import VolumeApplier, VolumeModel
 
 app = Flask(__name__)
 
 # Global variables
-mole_grid = []  # Grid showing which holes have moles
-mole_numbers = {}  # Dictionary mapping (row, col) to volume numbers
-mole_timers = {}  # Dictionary mapping (row, col) to spawn time
-score = 0
-game_active = False
-spawn_thread = None
-volume_decay_thread = None
+grid_rows = int(os.environ.get('WHACK_GRID_ROWS', 10))  # Number of grid rows
+grid_cols = int(os.environ.get('WHACK_GRID_COLS', 10))  # Number of grid columns
+max_moles = int(os.environ.get('WHACK_MAX_MOLES', 3))  # Max moles visible at once
 spawn_interval = 0.8  # Seconds between mole spawns
 mole_ttl = 3.0  # Time to live for moles (seconds)
 volume_decay_interval = 1.0  # Seconds between volume decreases
 volume_decay_amount = 5  # Amount to decrease volume by
-lock = threading.Lock()
+volume_sync_interval = float(os.environ.get('WHACK_VOLUME_SYNC_INTERVAL', 5.0))  # Seconds between system volume writes
+session_idle_timeout = 600.0  # Seconds before an idle session's game is evicted
+sse_keepalive = 15.0  # Seconds between keep-alive comments on idle streams
+max_batch_hits = 100  # Most hits accepted in one /hit/batch request
+leaderboard_path = os.environ.get(
+    'WHACK_LEADERBOARD_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'leaderboard.db')
+)  # SQLite file for finished rounds; empty to keep them in memory only
+max_name_length = 32
+session_cookie = 'whack_session'
+session_id_pattern = re.compile(r'^[A-Za-z0-9_-]{16,64}$')
+
+# Finished rounds, ranked in memory and written to disk in the background
+leaderboard = Leaderboard(leaderboard_path or None)
+atexit.register(leaderboard.flush, 5.0)
+
+# Record a finished round on the leaderboard
+def record_round(game, round_score):
+    """Add a finished round to the leaderboard and return its rank"""
+    if round_score <= 0:
+        return None
+    return leaderboard.add(game.player_name or 'Anonymous', round_score)
 
-# Initialize mole grid (10x10)
-def init_grid():
-    global mole_grid
-    mole_grid = [[False for _ in range(10)] for _ in range(10)]
-    mole_numbers.clear()
-    mole_timers.clear()
+# Create a game for a new session
+def new_game(session_id):
+    board = MoleBoard(grid_rows, grid_cols, max_moles=max_moles, mole_ttl=mole_ttl)
+    return Game(session_id, board, spawn_interval=spawn_interval, on_finish=record_round)
+
+# One game per browser session
+registry = GameRegistry(new_game, idle_timeout=session_idle_timeout)
+
+# Drives spawn, expiry and decay ticks for every game on a single thread
+scheduler = Scheduler()
+scheduler.call_every(60.0, registry.evict_idle)
 
 # Set macOS volume
 def set_volume(level):
@@ -53,158 +82,305 @@ def get_volume():
     except Exception:
         return 50
 
-# Spawn moles randomly
-def spawn_mole():
-    """Continuously spawn moles while game is active"""
-    while game_active:
-        with lock:
-            # Remove expired moles
-            current_time = time.time()
-            expired_moles = []
-            for (row, col), spawn_time in mole_timers.items():
-                if current_time - spawn_time > mole_ttl:
-                    expired_moles.append((row, col))
-            
-            for pos in expired_moles:
-                row, col = pos
-                mole_grid[row][col] = False
-                if pos in mole_numbers:
-                    del mole_numbers[pos]
-                if pos in mole_timers:
-                    del mole_timers[pos]
-            
-            # Find empty holes
-            empty_holes = []
-            for row in range(10):
-                for col in range(10):
-                    if not mole_grid[row][col]:
-                        empty_holes.append((row, col))
-            
-            # Spawn new mole if conditions are met
-            if empty_holes and len(mole_numbers) < 3:  # Max 3 moles at once
-                row, col = random.choice(empty_holes)
-                mole_grid[row][col] = True
-                mole_numbers[(row, col)] = random.randint(1, 100)
-                mole_timers[(row, col)] = time.time()
-        
-        time.sleep(spawn_interval)
-
-# Volume decay function
-def volume_decay():
-    """Continuously decrease volume while game is active"""
-    while game_active:
-        try:
-            current_volume = get_volume()
-            new_volume = max(0, current_volume - volume_decay_amount)
-            set_volume(new_volume)
-        except Exception as e:
-            print(f"Error in volume decay: {e}")
-        
-        time.sleep(volume_decay_interval)
+# Modelled system volume; decay is computed on read instead of polled
+volume_model = VolumeModel(
+    reader=lambda: get_volume(),
+    writer=lambda level: set_volume(level),
+    decay_rate=volume_decay_amount / volume_decay_interval
+)
+
+# Volume state sent to clients, which extrapolate the decay locally
+def volume_state():
+    return {'volume': volume_model.read(), 'decay_per_second': volume_model.rate()}
+
+# Tell streaming clients about the volume
+def publish_volume(event_type='volume', **extra):
+    """Publish the modelled volume to every game with a live stream"""
+    # The volume is system-wide, so every game with a live stream hears about it
+    data = volume_state()
+    data.update(extra)
+    for game in registry.games():
+        if game.subscribers:
+            with game.lock:
+                game.publish(event_type, data)
+
+# Confirmation that the system volume caught up with the model
+def volume_applied(level, seq):
+    publish_volume('volume_applied', applied=level, apply_seq=seq)
+
+# Writes the system volume off the request path; only the latest level is applied
+volume_applier = VolumeApplier(volume_model, on_applied=volume_applied)
+atexit.register(volume_applier.flush, 5.0)
+
+# Periodic system volume write, skipped when nobody is playing or watching
+def sync_volume():
+    """Queue a system volume sync (scheduled every volume_sync_interval)"""
+    # An idle sync reads the system volume, forking osascript, so only pick up
+    # outside changes while someone can see them; a pending write always goes out
+    if volume_model.pending() or any(game.active or game.subscribers for game in registry.games()):
+        volume_applier.submit()
+
+scheduler.call_every(volume_sync_interval, sync_volume)
 
-# Initialize grid on startup
-init_grid()
+# Look up the game for the current request's session
+def current_game():
+    """Return the caller's game, starting a new session if needed"""
+    session_id = request.cookies.get(session_cookie, '')
+    if not session_id_pattern.match(session_id):
+        session_id = secrets.token_urlsafe(16)
+        g.new_session_id = session_id
+    return registry.get(session_id)
+
+@app.after_request
+def set_session_cookie(response):
+    session_id = g.get('new_session_id')
+    if session_id:
+        response.set_cookie(session_cookie, session_id, httponly=True, samesite='Lax')
+    return response
+
+# Format a Server-Sent Event; the id carries the game instance so a replaced game is never resumed
+def format_event(instance_id, version, event_type, data):
+    return f"id: {instance_id}-{version}\nevent: {event_type}\ndata: {json.dumps(data)}\n\n"
 
 @app.route('/')
 def index():
-    return render_template('index.html')
+    current_game()
+    return render_template('index.html', rows=grid_rows, cols=grid_cols)
 
 @app.route('/grid', methods=['GET'])
 def get_grid():
-    """Return the current grid state"""
-    with lock:
-        # Convert mole_numbers dict to grid format
-        grid = [[0 for _ in range(10)] for _ in range(10)]
-        for (row, col), number in mole_numbers.items():
-            grid[row][col] = number
-        
-        return jsonify({'grid': grid, 'score': score, 'game_active': game_active})
+    """Return the live moles, or 304 Not Modified if the client's version is current
+
+    Moles are a sparse list of {row, col, number, expires_at}, where expires_at
+    is the server's Unix time at which the mole goes down. It is absolute, so
+    a cached response stays correct for as long as its ETag matches; clients
+    count down against it themselves.
+    """
+    game = current_game()
+    with game.lock:
+        etag = game.etag()
+        if etag in request.if_none_match:
+            response = Response(status=304)
+        else:
+            response = jsonify({
+                'version': game.version,
+                'rows': grid_rows,
+                'cols': grid_cols,
+                'moles': game.live_moles(),
+                'score': game.score,
+                'game_active': game.active
+            })
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/hit', methods=['POST'])
 def hit_cell():
     """Handle hitting a mole"""
-    global mole_numbers, score
-    
     try:
         data = request.json
-        row = data['row']
-        col = data['col']
-        
-        volume_level = None
-        with lock:
-            # Check if there's a mole at this position
-            if (row, col) in mole_numbers:
-                # Get the volume number
-                volume_level = mole_numbers[(row, col)]
-                
-                # Remove the mole
-                mole_grid[row][col] = False
-                del mole_numbers[(row, col)]
-                if (row, col) in mole_timers:
-                    del mole_timers[(row, col)]
-        
-        # Set volume outside of lock to avoid blocking
+        try:
+            row = int(data['row'])
+            col = int(data['col'])
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'row and col must be integers'})
+
+        # Remove the mole at this position, if any, and score it in the same step,
+        # so a concurrent /stop cannot end the round in between
+        game = current_game()
+        volume_level, new_score = game.whack(row, col)
+
+        # Accept the hit right away; the system volume is written in the background
         if volume_level is not None:
-            if set_volume(volume_level):
-                score += 1
-                
-                return jsonify({
-                    'success': True,
-                    'volume_set': volume_level,
-                    'score': score,
-                    'current_volume': get_volume()
-                })
-            else:
-                return jsonify({'success': False, 'error': 'Failed to set volume'})
+            level = volume_model.set(volume_level)
+            apply_seq = volume_applier.submit()
+            publish_volume()
+
+            return jsonify({
+                'success': True,
+                'volume_set': volume_level,
+                'score': new_score,
+                'current_volume': level,
+                'apply_seq': apply_seq
+            })
         else:
             return jsonify({'success': False, 'error': 'No mole here!'})
-            
+
+    except Exception as e:
+        return jsonify({'success': False, 'error': str(e)})
+
+@app.route('/hit/batch', methods=['POST'])
+def hit_batch():
+    """Handle an ordered burst of hits in one request
+
+    Expects {"hits": [{"row", "col", "client_ts"}, ...]}. All hits are resolved
+    against the board in one lock acquisition and only the volume of the last
+    successful hit is applied to the system.
+    """
+    try:
+        hits = request.json['hits']
+        if len(hits) > max_batch_hits:
+            return jsonify({'success': False, 'error': f'At most {max_batch_hits} hits per batch'})
+        positions = [(int(hit['row']), int(hit['col'])) for hit in hits]
+
+        game = current_game()
+        numbers, new_score = game.hit_many(positions)
+
+        results = []
+        for hit, number in zip(hits, numbers):
+            result = {'row': hit['row'], 'col': hit['col'], 'client_ts': hit.get('client_ts')}
+            if number is not None:
+                result.update({'success': True, 'volume_set': number})
+            else:
+                result.update({'success': False, 'error': 'No mole here!'})
+            results.append(result)
+
+        response = {
+            'success': any(number is not None for number in numbers),
+            'results': results,
+            'score': new_score,
+            'current_volume': volume_model.read()
+        }
+
+        # Only the final level matters, so intermediate hits never reach the system
+        final_level = next((number for number in reversed(numbers) if number is not None), None)
+        if final_level is not None:
+            response['current_volume'] = volume_model.set(final_level)
+            response['apply_seq'] = volume_applier.submit()
+            publish_volume()
+
+        return jsonify(response)
+
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
 @app.route('/start', methods=['POST'])
 def start_game():
     """Start the game"""
-    global game_active, spawn_thread, volume_decay_thread
-    
-    if not game_active:
-        game_active = True
-        spawn_thread = threading.Thread(target=spawn_mole, daemon=True)
-        spawn_thread.start()
-        volume_decay_thread = threading.Thread(target=volume_decay, daemon=True)
-        volume_decay_thread.start()
+    game = current_game()
+    if game.start():
+        # Ticks and decay are cancelled when the game stops, so a quick
+        # stop/start never leaves old ones running alongside the new ones
+        game.add_tasks(
+            scheduler.call_every(game.spawn_interval, game.tick, delay=0),
+            volume_model.start_decay()
+        )
+        publish_volume()
         return jsonify({'success': True, 'message': 'Game started!'})
     else:
         return jsonify({'success': False, 'message': 'Game already running!'})
 
 @app.route('/stop', methods=['POST'])
 def stop_game():
-    """Stop the game"""
-    global game_active, mole_grid, mole_numbers
-    game_active = False
-    
-    # Clear all moles
-    init_grid()
-    
-    return jsonify({'success': True, 'message': 'Game stopped!'})
+    """Stop the game, recording the round on the leaderboard"""
+    game = current_game()
+    data = request.get_json(silent=True) or {}
+    name = str(data.get('name') or '').strip()[:max_name_length]
+    if name:
+        game.player_name = name
+
+    # Stopping also clears all moles
+    rank = game.stop()
+    publish_volume()
+    return jsonify({'success': True, 'message': 'Game stopped!', 'rank': rank})
 
 @app.route('/status', methods=['GET'])
 def get_status():
     """Get current status including volume"""
+    game = current_game()
     return jsonify({
-        'score': score,
-        'current_volume': get_volume(),
-        'game_active': game_active
+        'score': game.score,
+        'current_volume': volume_model.read(),
+        'game_active': game.active
     })
 
 @app.route('/reset', methods=['POST'])
 def reset():
     """Reset the game"""
-    global score, game_active, mole_grid, mole_numbers
-    game_active = False
-    init_grid()
-    score = 0
-    return jsonify({'success': True, 'score': score, 'message': 'Game reset!'})
+    game = current_game()
+    game.reset()
+    publish_volume()
+    return jsonify({'success': True, 'score': game.score, 'message': 'Game reset!'})
+
+@app.route('/leaderboard', methods=['GET'])
+def get_leaderboard():
+    """Return the best finished rounds (?limit=, default 100)"""
+    limit = max(1, min(request.args.get('limit', 100, type=int), 1000))
+    return jsonify({'entries': leaderboard.top(limit), 'total': len(leaderboard)})
+
+@app.route('/leaderboard/rank', methods=['GET'])
+def get_rank():
+    """Return the rank a round with ?score= would have"""
+    score = request.args.get('score', type=int)
+    if score is None:
+        return jsonify({'success': False, 'error': 'score is required'})
+    return jsonify({'success': True, 'score': score, 'rank': leaderboard.rank(score),
+                    'total': len(leaderboard)})
+
+@app.route('/scheduler', methods=['GET'])
+def get_scheduler_stats():
+    """Report scheduler tick counts, jitter and thread count"""
+    stats = scheduler.stats()
+    stats['volume_writes'] = volume_model.writes
+    stats['volume_reads'] = volume_model.reads
+    return jsonify(stats)
+
+@app.route('/events', methods=['GET'])
+def stream_events():
+    """Stream the session's game state changes as Server-Sent Events"""
+    # Browsers send Last-Event-ID ("<instance>-<version>") when reconnecting;
+    # ?since= allows manual resume
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('since') or ''
+    last_instance, _, last_version = last_id.rpartition('-')
+    try:
+        last_version = int(last_version)
+    except ValueError:
+        last_version = None
+
+    game = current_game()
+
+    def generate():
+        nonlocal game
+        # Versions from another game instance mean nothing here; start from a snapshot
+        sent = last_version if last_instance == game.instance_id else None
+        with game.lock:
+            game.subscribers += 1
+        try:
+            while True:
+                # Streaming counts as activity, so the game is not evicted
+                latest = registry.get(game.session_id)
+                if latest is not game:
+                    # The game was evicted and replaced; follow the new one
+                    with game.lock:
+                        game.subscribers -= 1
+                    game = latest
+                    with game.lock:
+                        game.subscribers += 1
+                    sent = None
+                pending = game.events_after(sent, sse_keepalive)
+                if pending is None:
+                    # Unknown or too old to replay: start from a full snapshot
+                    with game.lock:
+                        sent = game.version
+                        state = game.snapshot(volume_model.read())
+                        state['decay_per_second'] = volume_model.rate()
+                        pending = [(sent, 'snapshot', state)]
+                elif pending:
+                    sent = pending[-1][0]
+
+                if pending:
+                    yield ''.join(format_event(game.instance_id, *e) for e in pending)
+                else:
+                    yield ': keep-alive\n\n'
+        finally:
+            with game.lock:
+                game.subscribers -= 1
+
+    return Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=8001, threaded=True)
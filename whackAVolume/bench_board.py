@@ -0,0 +1,94 @@
+"""Benchmark the cost of one spawn/expire tick against grid size.
+
+Compares MoleBoard with the original approach of scanning every timer and
+every cell on each tick.
+
+Usage:
+    python bench_board.py [--ticks N] [--sizes 10,50,200] [--moles 3,300]
+"""
+
+import argparse
+import random
+import time
+
+from board import MoleBoard
+
+
+class ScanBoard:
+    """The original bookkeeping: full scans of timers and cells per tick."""
+
+    def __init__(self, rows, cols, max_moles, mole_ttl):
+        self.rows = rows
+        self.cols = cols
+        self.max_moles = max_moles
+        self.mole_ttl = mole_ttl
+        self.grid = [[False for _ in range(cols)] for _ in range(rows)]
+        self.numbers = {}
+        self.timers = {}
+
+    def tick(self, now):
+        expired = [pos for pos, spawn_time in self.timers.items()
+                   if now - spawn_time > self.mole_ttl]
+        for row, col in expired:
+            self.grid[row][col] = False
+            del self.numbers[(row, col)]
+            del self.timers[(row, col)]
+
+        empty_holes = []
+        for row in range(self.rows):
+            for col in range(self.cols):
+                if not self.grid[row][col]:
+                    empty_holes.append((row, col))
+
+        if empty_holes and len(self.numbers) < self.max_moles:
+            row, col = random.choice(empty_holes)
+            self.grid[row][col] = True
+            self.numbers[(row, col)] = random.randint(1, 100)
+            self.timers[(row, col)] = now
+
+
+def run(tick, ticks, tick_seconds):
+    """Drive a board with a simulated clock and return microseconds per tick."""
+    now = 0.0
+    start = time.perf_counter()
+    for _ in range(ticks):
+        now += tick_seconds
+        tick(now)
+    return (time.perf_counter() - start) / ticks * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--ticks', type=int, default=2000, help='Ticks per measurement')
+    parser.add_argument('--sizes', default='10,50,100,200', help='Comma-separated grid sizes (NxN)')
+    parser.add_argument('--moles', default='3,300', help='Comma-separated max concurrent moles')
+    parser.add_argument('--ttl-ticks', type=int, default=400,
+                        help='Mole lifetime in ticks (long enough for the board to fill up)')
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',')]
+    moles = [int(m) for m in args.moles.split(',')]
+    tick_seconds = 0.01
+    mole_ttl = args.ttl_ticks * tick_seconds
+
+    print(f"{'grid':>9} {'moles':>6} {'scan us/tick':>13} {'heap us/tick':>13} {'speedup':>8}")
+    for size in sizes:
+        for max_moles in moles:
+            random.seed(0)
+            scan = ScanBoard(size, size, max_moles, mole_ttl)
+            scan_us = run(scan.tick, args.ticks, tick_seconds)
+
+            board = MoleBoard(size, size, max_moles=max_moles, mole_ttl=mole_ttl,
+                              rng=random.Random(0))
+
+            def heap_tick(now):
+                board.expire(now)
+                board.spawn(now)
+
+            heap_us = run(heap_tick, args.ticks, tick_seconds)
+            print(f"{size:>4}x{size:<4} {max_moles:>6} {scan_us:>13.2f} {heap_us:>13.2f} "
+                  f"{scan_us / heap_us:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
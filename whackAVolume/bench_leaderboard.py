@@ -0,0 +1,62 @@
+"""Benchmark leaderboard inserts, rank lookups and top-100 reads.
+
+Usage:
+    python bench_leaderboard.py [--entries 300000] [--queries 10000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from leaderboard import Leaderboard
+
+
+def timed(fn, count):
+    """Run fn count times and return microseconds per call."""
+    start = time.perf_counter()
+    for _ in range(count):
+        fn()
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--entries', type=int, default=300000, help='Entries to preload')
+    parser.add_argument('--queries', type=int, default=10000, help='Measured operations of each kind')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    board = Leaderboard()
+    start = time.perf_counter()
+    for i in range(args.entries):
+        board.add(f'player{i}', rng.randint(0, 500), finished_at=i)
+    print(f"preload     {args.entries} entries in {time.perf_counter() - start:.2f}s")
+
+    insert_us = timed(lambda: board.add('bench', rng.randint(0, 500)), args.queries)
+    rank_us = timed(lambda: board.rank(rng.randint(0, 500)), args.queries)
+    top_us = timed(lambda: board.top(100), args.queries)
+    print(f"insert      {insert_us:8.2f} us/op  (n={len(board)})")
+    print(f"rank        {rank_us:8.2f} us/op")
+    print(f"top-100     {top_us:8.2f} us/op")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'leaderboard.db')
+        persisted = Leaderboard(path)
+        start = time.perf_counter()
+        for i in range(args.queries):
+            persisted.add('bench', rng.randint(0, 500))
+        add_us = (time.perf_counter() - start) / args.queries * 1e6
+        persisted.flush()
+        total = time.perf_counter() - start
+        print(f"persisted   {add_us:8.2f} us/op on the caller, "
+              f"{args.queries / total:.0f} rows/s written behind")
+
+        start = time.perf_counter()
+        reloaded = Leaderboard(path)
+        print(f"reload      {len(reloaded)} entries in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
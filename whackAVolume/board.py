@@ -0,0 +1,134 @@
+"""Mole bookkeeping for Whack-A-Volume.
+
+Expiry is tracked with a min-heap keyed by expiry time and empty holes with
+an indexed free list, so spawning and expiring cost O(log n) regardless of
+the board size.
+"""
+
+import heapq
+import random
+
+
+class MoleBoard:
+    """Grid of holes with live moles, their numbers and expiry times."""
+
+    def __init__(self, rows=10, cols=10, max_moles=3, mole_ttl=3.0, rng=None):
+        """
+        Args:
+            rows: Number of grid rows
+            cols: Number of grid columns
+            max_moles: Maximum number of moles visible at once
+            mole_ttl: Seconds a mole stays up before it expires
+            rng: Random number generator (defaults to the random module)
+        """
+        if rows < 1 or cols < 1:
+            raise ValueError("Grid must have at least one row and one column")
+        if max_moles < 1:
+            raise ValueError("max_moles must be at least 1")
+
+        self.rows = rows
+        self.cols = cols
+        self.max_moles = max_moles
+        self.mole_ttl = mole_ttl
+        self.rng = rng or random
+
+        self.moles = {}  # cell -> (number, expires_at, token)
+        self._expiry_heap = []  # (expires_at, token, cell); stale entries skipped lazily
+        self._next_token = 0
+        self._free = []  # Empty cells, in no particular order
+        self._free_index = []  # cell -> position in _free, or -1 if occupied
+        self.clear()
+
+    def clear(self):
+        """Remove every mole."""
+        size = self.rows * self.cols
+        self.moles.clear()
+        self._expiry_heap = []
+        self._free = list(range(size))
+        self._free_index = list(range(size))
+
+    def __len__(self):
+        return len(self.moles)
+
+    def _cell(self, row, col):
+        # Only whole-number coordinates name a cell; anything else is a miss
+        if type(row) is not int or type(col) is not int:
+            return None
+        if not (0 <= row < self.rows and 0 <= col < self.cols):
+            return None
+        return row * self.cols + col
+
+    def _take_free(self, cell):
+        """Mark a cell as occupied in O(1) by swapping it with the last free cell."""
+        pos = self._free_index[cell]
+        last = self._free.pop()
+        if last != cell:
+            self._free[pos] = last
+            self._free_index[last] = pos
+        self._free_index[cell] = -1
+
+    def _release(self, cell):
+        """Mark a cell as empty again."""
+        self._free_index[cell] = len(self._free)
+        self._free.append(cell)
+
+    def spawn(self, now):
+        """Spawn a mole in a random empty hole.
+
+        Returns:
+            (row, col, number, expires_at), or None if the board is full
+        """
+        if not self._free or len(self.moles) >= self.max_moles:
+            return None
+
+        cell = self._free[self.rng.randrange(len(self._free))]
+        self._take_free(cell)
+
+        number = self.rng.randint(1, 100)
+        expires_at = now + self.mole_ttl
+        token = self._next_token
+        self._next_token += 1
+        self.moles[cell] = (number, expires_at, token)
+        heapq.heappush(self._expiry_heap, (expires_at, token, cell))
+
+        row, col = divmod(cell, self.cols)
+        return row, col, number, expires_at
+
+    def expire(self, now):
+        """Remove moles whose time is up.
+
+        Returns:
+            List of (row, col) positions that expired
+        """
+        expired = []
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            _, token, cell = heapq.heappop(heap)
+            mole = self.moles.get(cell)
+            if mole is None or mole[2] != token:
+                continue  # Already hit; this entry is stale
+            del self.moles[cell]
+            self._release(cell)
+            expired.append(divmod(cell, self.cols))
+        return expired
+
+    def hit(self, row, col):
+        """Remove the mole at (row, col).
+
+        Returns:
+            The mole's number, or None if the hole is empty
+        """
+        cell = self._cell(row, col)
+        if cell is None:
+            return None
+        mole = self.moles.pop(cell, None)
+        if mole is None:
+            return None
+        self._release(cell)
+        return mole[0]
+
+    def live_moles(self):
+        """Yield (row, col, number, expires_at) for every live mole."""
+        for cell, (number, expires_at, _) in self.moles.items():
+            row, col = divmod(cell, self.cols)
+            yield row, col, number, expires_at
@@ -0,0 +1,39 @@
+"""In-memory stand-in for the osascript volume helpers.
+
+Shared by load_test.py and the launcher's bench_http.py, so benchmarks
+measure the games instead of forking osascript.
+"""
+
+import threading
+import time
+
+
+class FakeVolume:
+    """Holds a volume level in memory, optionally as slowly as osascript."""
+
+    def __init__(self, level=50, latency=0.0):
+        """
+        Args:
+            level: Starting volume (0-100)
+            latency: Seconds each call sleeps, to mimic forking osascript
+        """
+        self.level = level
+        self.latency = latency
+        self.reads = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+
+    def get(self):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.reads += 1
+            return self.level
+
+    def set(self, level):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.writes += 1
+            self.level = max(0, min(100, int(level)))
+        return True
@@ -0,0 +1,247 @@
+"""Per-session game state for Whack-A-Volume.
+
+Each browser session gets its own Game with its own lock, so players never
+contend with each other. GameRegistry maps session IDs to games and evicts
+games that have been idle for too long.
+"""
+
+import secrets
+import threading
+import time
+from collections import OrderedDict, deque
+
+
+class Game:
+    """One player's board, score and event stream, guarded by its own lock."""
+
+    def __init__(self, session_id, board, spawn_interval=0.8, event_log_size=500, on_finish=None):
+        """
+        Args:
+            session_id: ID of the session that owns this game
+            board: MoleBoard to play on
+            spawn_interval: Seconds between mole spawns
+            event_log_size: Number of recent events kept for resuming clients
+            on_finish: Called as on_finish(game, round_score) when a running
+                game stops; its return value is returned by stop()/reset()
+        """
+        self.session_id = session_id
+        self.board = board
+        self.spawn_interval = spawn_interval
+        self.on_finish = on_finish
+        self.score = 0
+        self.round_start_score = 0  # Score when the current round started
+        self.player_name = None
+        self.active = False
+        self.last_seen = time.monotonic()
+        self.subscribers = 0  # Number of connected event streams
+        self.tasks = []  # Scheduler tasks driving this game while it is active
+
+        self.lock = threading.Lock()
+        self.changed = threading.Condition(self.lock)  # Notified on every event
+        self.version = 0  # Monotonic version, bumped on every published change
+        self.instance_id = secrets.token_hex(4)  # Tells versions of a replaced game apart
+        self.events = deque(maxlen=event_log_size)  # Recent (version, type, data)
+
+    def publish(self, event_type, data):
+        """Record an event and wake up streaming clients (caller must hold lock)."""
+        self.version += 1
+        self.events.append((self.version, event_type, data))
+        self.changed.notify_all()
+
+    def snapshot(self, volume=None):
+        """Return the full game state (caller must hold lock)."""
+        return {
+            'moles': [
+                {'row': row, 'col': col, 'number': number}
+                for row, col, number, _ in self.board.live_moles()
+            ],
+            'score': self.score,
+            'game_active': self.active,
+            'volume': volume
+        }
+
+    def etag(self):
+        """Return an entity tag for the current state version (caller must hold lock)."""
+        return f'{self.instance_id}-{self.version}'
+
+    def live_moles(self):
+        """Return live moles with the Unix time each expires at (caller must hold lock)."""
+        return [
+            {'row': row, 'col': col, 'number': number, 'expires_at': round(expires_at, 3)}
+            for row, col, number, expires_at in self.board.live_moles()
+        ]
+
+    def events_after(self, version, timeout):
+        """Wait for events newer than version.
+
+        Returns:
+            List of (version, type, data) events, possibly empty if the timeout
+            passed, or None if version can no longer be resumed from the log
+        """
+        with self.lock:
+            oldest = self.events[0][0] if self.events else self.version + 1
+            if version is None or version > self.version or version < oldest - 1:
+                return None
+            self.changed.wait_for(lambda: self.version > version, timeout=timeout)
+            return [e for e in self.events if e[0] > version]
+
+    def tick(self, now=None):
+        """Expire old moles and spawn a new one if there is room."""
+        if now is None:
+            now = time.time()
+        with self.lock:
+            if not self.active:
+                return
+            for row, col in self.board.expire(now):
+                self.publish('mole_expired', {'row': row, 'col': col})
+
+            spawned = self.board.spawn(now)
+            if spawned:
+                row, col, number, _ = spawned
+                self.publish('mole_spawned', {'row': row, 'col': col, 'number': number})
+
+    def whack(self, row, col):
+        """Whack the mole at (row, col) and score it, under one lock acquisition.
+
+        Returns:
+            (number, score): the mole's volume number (None if there was no
+            mole) and the score afterwards
+        """
+        numbers, score = self.hit_many([(row, col)])
+        return numbers[0], score
+
+    def hit_many(self, positions):
+        """Whack several holes in order under a single lock acquisition.
+
+        Returns:
+            (numbers, score): each position's mole number (None for a miss)
+            and the score after all hits
+        """
+        with self.lock:
+            numbers = []
+            for row, col in positions:
+                number = self.board.hit(row, col)
+                if number is not None:
+                    self.publish('mole_hit', {'row': row, 'col': col, 'number': number})
+                numbers.append(number)
+
+            hits = sum(1 for number in numbers if number is not None)
+            if hits:
+                self.score += hits
+                self.publish('score', {'score': self.score})
+            return numbers, self.score
+
+    def start(self):
+        """Start the game. Returns False if it was already running."""
+        with self.lock:
+            if self.active:
+                return False
+            self.active = True
+            self.round_start_score = self.score
+            self.publish('game', {'game_active': True})
+            return True
+
+    def add_tasks(self, *tasks):
+        """Attach scheduler tasks that are cancelled when the game stops."""
+        with self.lock:
+            if self.active:
+                self.tasks.extend(tasks)
+                return
+        # Stopped in the meantime
+        for task in tasks:
+            task.cancel()
+
+    def _cancel_tasks(self):
+        for task in self.tasks:
+            task.cancel()
+        self.tasks = []
+
+    def _finish_locked(self):
+        # Returns the round's score if a round was running (caller must hold lock)
+        was_active = self.active
+        self.active = False
+        self._cancel_tasks()
+        self.board.clear()
+        self.publish('game', {'game_active': False, 'moles': []})
+        return self.score - self.round_start_score if was_active else None
+
+    def _report(self, round_score):
+        if round_score is None or self.on_finish is None:
+            return None
+        return self.on_finish(self, round_score)
+
+    def stop(self):
+        """Stop the game and clear all moles."""
+        with self.lock:
+            round_score = self._finish_locked()
+        return self._report(round_score)
+
+    def reset(self):
+        """Stop the game and reset the score."""
+        with self.lock:
+            round_score = self._finish_locked()
+            self.score = 0
+            self.round_start_score = 0
+            self.publish('score', {'score': self.score})
+        return self._report(round_score)
+
+
+class GameRegistry:
+    """Session ID to Game mapping with least-recently-used idle eviction."""
+
+    def __init__(self, factory, idle_timeout=600.0, max_sessions=10000):
+        """
+        Args:
+            factory: Callable taking a session ID and returning a new Game
+            idle_timeout: Seconds without activity before a game is evicted
+            max_sessions: Maximum number of games kept at once
+        """
+        self.factory = factory
+        self.idle_timeout = idle_timeout
+        self.max_sessions = max_sessions
+        self._games = OrderedDict()  # Least recently used first
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._games)
+
+    def get(self, session_id):
+        """Return the session's game, creating it if needed, and mark it active."""
+        now = time.monotonic()
+        with self._lock:
+            game = self._games.get(session_id)
+            if game is None:
+                game = self.factory(session_id)
+                self._games[session_id] = game
+            else:
+                self._games.move_to_end(session_id)
+            game.last_seen = now
+            evicted = self._evict_locked(now)
+
+        for old in evicted:
+            old.stop()
+        return game
+
+    def games(self):
+        """Return a list of all current games."""
+        with self._lock:
+            return list(self._games.values())
+
+    def evict_idle(self):
+        """Evict games idle longer than idle_timeout. Returns the evicted games."""
+        with self._lock:
+            evicted = self._evict_locked(time.monotonic())
+        for old in evicted:
+            old.stop()
+        return evicted
+
+    def _evict_locked(self, now):
+        # Games are ordered by last use, so only the front needs checking
+        evicted = []
+        while self._games:
+            session_id, game = next(iter(self._games.items()))
+            if len(self._games) <= self.max_sessions and now - game.last_seen < self.idle_timeout:
+                break
+            del self._games[session_id]
+            evicted.append(game)
+        return evicted
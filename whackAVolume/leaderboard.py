@@ -0,0 +1,196 @@
+"""Leaderboard of finished Whack-A-Volume rounds.
+
+Entries live in an in-memory sorted index split into bounded chunks, so
+inserts and rank lookups cost O(log n) plus a small per-chunk term and top-k
+reads only touch the first chunks. Persistence is write-behind: new entries
+are queued and inserted into SQLite in batches by a background thread, so
+finishing a game never waits on disk.
+"""
+
+import bisect
+import itertools
+import queue
+import sqlite3
+import threading
+import time
+
+
+class SortedIndex:
+    """Sorted sequence stored as a list of chunks of at most 2 * load items.
+
+    Inserting only shifts items within one chunk, instead of the whole list.
+    """
+
+    def __init__(self, items=(), load=1000):
+        """
+        Args:
+            items: Initial items, already sorted
+            load: Target chunk size
+        """
+        self.load = load
+        items = list(items)
+        self._chunks = [items[i:i + load] for i in range(0, len(items), load)]
+        self._maxes = [chunk[-1] for chunk in self._chunks]
+        self._len = len(items)
+
+    def __len__(self):
+        return self._len
+
+    def insert(self, item):
+        """Insert an item, keeping the sequence sorted."""
+        self._len += 1
+        if not self._chunks:
+            self._chunks.append([item])
+            self._maxes.append(item)
+            return
+
+        i = bisect.bisect_left(self._maxes, item)
+        if i == len(self._maxes):
+            i -= 1
+        chunk = self._chunks[i]
+        bisect.insort(chunk, item)
+        self._maxes[i] = chunk[-1]
+
+        if len(chunk) > 2 * self.load:
+            self._chunks[i:i + 1] = [chunk[:self.load], chunk[self.load:]]
+            self._maxes[i:i + 1] = [chunk[self.load - 1], chunk[-1]]
+
+    def bisect_left(self, item):
+        """Return the number of items less than item."""
+        i = bisect.bisect_left(self._maxes, item)
+        if i == len(self._maxes):
+            return self._len
+        return sum(len(chunk) for chunk in self._chunks[:i]) + bisect.bisect_left(self._chunks[i], item)
+
+    def head(self, k):
+        """Return the first k items."""
+        result = []
+        for chunk in self._chunks:
+            if len(result) >= k:
+                break
+            result.extend(chunk[:k - len(result)])
+        return result
+
+
+class Leaderboard:
+    """Ranked finished rounds with batched SQLite persistence."""
+
+    def __init__(self, path=None, batch_size=500, flush_interval=1.0):
+        """
+        Args:
+            path: SQLite database file, or None to keep entries in memory only
+            batch_size: Most entries written in one transaction
+            flush_interval: Seconds to wait for more entries before writing a batch
+        """
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        # Sorted ascending by (-score, finished_at, id), so the best entries come first
+        self._index = SortedIndex()
+        self._ids = itertools.count(1)
+        self._pending = queue.SimpleQueue()
+        self._flushed = threading.Condition()
+        self._queued = 0
+        self._written = 0
+        self._writer = None
+
+        if path:
+            self._load()
+            self._writer = threading.Thread(target=self._write_behind, name='leaderboard-writer',
+                                            daemon=True)
+            self._writer.start()
+
+    def __len__(self):
+        return len(self._index)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS leaderboard ('
+            'id INTEGER PRIMARY KEY, name TEXT NOT NULL, '
+            'score INTEGER NOT NULL, finished_at REAL NOT NULL)'
+        )
+        return conn
+
+    def _load(self):
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                'SELECT id, name, score, finished_at FROM leaderboard '
+                'ORDER BY score DESC, finished_at, id'
+            ).fetchall()
+        finally:
+            conn.close()
+        self._index = SortedIndex((-score, finished_at, entry_id, name)
+                                  for entry_id, name, score, finished_at in rows)
+        last_id = max((row[0] for row in rows), default=0)
+        self._ids = itertools.count(last_id + 1)
+
+    def add(self, name, score, finished_at=None):
+        """Record a finished round and return its rank (1 is best).
+
+        Only the in-memory index is updated here; the database write is queued.
+        """
+        if finished_at is None:
+            finished_at = time.time()
+        with self._lock:
+            entry_id = next(self._ids)
+            self._index.insert((-score, finished_at, entry_id, name))
+            rank = self._index.bisect_left((-score,)) + 1
+
+        if self._writer is not None:
+            with self._flushed:
+                self._queued += 1
+            self._pending.put((entry_id, name, score, finished_at))
+        return rank
+
+    def top(self, k=100):
+        """Return the k best entries, best first."""
+        with self._lock:
+            best = self._index.head(k)
+        return [
+            {'rank': position + 1, 'name': name, 'score': -neg_score, 'finished_at': finished_at}
+            for position, (neg_score, finished_at, _, name) in enumerate(best)
+        ]
+
+    def rank(self, score):
+        """Return the rank a round with this score would have (ties share a rank)."""
+        with self._lock:
+            return self._index.bisect_left((-score,)) + 1
+
+    def flush(self, timeout=None):
+        """Wait until every queued entry is written. Returns True if it was."""
+        with self._flushed:
+            target = self._queued
+            return self._flushed.wait_for(lambda: self._written >= target, timeout=timeout)
+
+    def _write_behind(self):
+        conn = None
+        while True:
+            batch = [self._pending.get()]
+            if conn is None:
+                conn = self._connect()
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                with conn:
+                    conn.executemany(
+                        'INSERT OR REPLACE INTO leaderboard (id, name, score, finished_at) '
+                        'VALUES (?, ?, ?, ?)',
+                        batch
+                    )
+            except sqlite3.Error as e:
+                print(f"Error writing leaderboard: {e}")
+
+            with self._flushed:
+                self._written += len(batch)
+                self._flushed.notify_all()
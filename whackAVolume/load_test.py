@@ -0,0 +1,133 @@
+"""Load test for the multi-session game engine.
+
+Simulates many concurrent players, each with its own session, who start a
+game, poll the grid and whack whatever moles they see. The system volume is
+replaced with an in-memory level so the test measures game-state work only.
+
+Usage:
+    python load_test.py [--players 300] [--duration 10] [--spawn-interval 0.05] [--batch]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import threading
+import time
+
+# Keep simulated rounds off the real leaderboard
+os.environ['WHACK_LEADERBOARD_DB'] = ''
+
+import app as whack
+from fake_volume import FakeVolume
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def play(deadline, hit_latencies, grid_latencies, counts, start_barrier, batch=False):
+    """One simulated player: start a game, then poll and whack until the deadline."""
+    client = whack.app.test_client()
+    client.get('/')
+    client.post('/start')
+    start_barrier.wait()
+
+    hits = misses = 0
+    while time.perf_counter() < deadline:
+        t0 = time.perf_counter()
+        moles = client.get('/grid').get_json()['moles']
+        grid_latencies.append(time.perf_counter() - t0)
+
+        if not moles:
+            time.sleep(0.005)
+            continue
+
+        if batch:
+            # Whack every visible mole in one request
+            burst = [{'row': m['row'], 'col': m['col'], 'client_ts': time.time()} for m in moles]
+            t0 = time.perf_counter()
+            result = client.post('/hit/batch', json={'hits': burst}).get_json()
+            hit_latencies.append(time.perf_counter() - t0)
+            for hit in result['results']:
+                if hit['success']:
+                    hits += 1
+                else:
+                    misses += 1
+            continue
+
+        mole = random.choice(moles)
+        row, col = mole['row'], mole['col']
+        t0 = time.perf_counter()
+        result = client.post('/hit', json={'row': row, 'col': col}).get_json()
+        hit_latencies.append(time.perf_counter() - t0)
+        if result['success']:
+            hits += 1
+        else:
+            misses += 1
+
+    client.post('/stop')
+    with counts['lock']:
+        counts['hits'] += hits
+        counts['misses'] += misses
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--players', type=int, default=300, help='Concurrent simulated players')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds to run')
+    parser.add_argument('--spawn-interval', type=float, default=0.05,
+                        help='Seconds between mole spawns in each game')
+    parser.add_argument('--batch', action='store_true',
+                        help='Send all visible moles as one /hit/batch request')
+    args = parser.parse_args()
+
+    volume = FakeVolume()
+    whack.get_volume = volume.get
+    whack.set_volume = volume.set
+    whack.spawn_interval = args.spawn_interval
+
+    hit_latencies = []
+    grid_latencies = []
+    counts = {'hits': 0, 'misses': 0, 'lock': threading.Lock()}
+    start_barrier = threading.Barrier(args.players + 1)
+    deadline = [0.0]
+
+    def player():
+        start_barrier.wait()
+        play(deadline[0], hit_latencies, grid_latencies, counts, start_barrier, args.batch)
+
+    threads = [threading.Thread(target=player, daemon=True) for _ in range(args.players)]
+    for thread in threads:
+        thread.start()
+
+    deadline[0] = time.perf_counter() + args.duration
+    start_barrier.wait()  # Everyone is created
+    start_barrier.wait()  # Everyone has started a game
+    started = time.perf_counter()
+    running_threads = threading.active_count()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    def summary(name, samples):
+        ms = [s * 1000 for s in samples]
+        print(f"{name:<6} n={len(ms):<7} mean={statistics.fmean(ms) if ms else 0:7.2f} ms  "
+              f"p50={percentile(ms, 50):7.2f} ms  p95={percentile(ms, 95):7.2f} ms  "
+              f"p99={percentile(ms, 99):7.2f} ms  max={max(ms) if ms else 0:7.2f} ms")
+
+    print(f"players={args.players} sessions={len(whack.registry)} elapsed={elapsed:.1f}s "
+          f"threads={running_threads}")
+    print(f"hits={counts['hits']} misses={counts['misses']} "
+          f"throughput={len(hit_latencies) / elapsed:.0f} hit requests/s, "
+          f"{counts['hits'] / elapsed:.0f} hits/s")
+    summary('hit', hit_latencies)
+    summary('grid', grid_latencies)
+
+
+if __name__ == '__main__':
+    main()
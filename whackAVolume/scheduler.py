@@ -0,0 +1,135 @@
+"""Single-threaded timer scheduler for Whack-A-Volume.
+
+All periodic game work (mole spawns and expiry, volume decay) runs as tasks
+on one heap-ordered event loop thread, so the number of threads stays the
+same no matter how many games start and stop.
+"""
+
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+
+
+class Task:
+    """Handle for a scheduled callback."""
+
+    def __init__(self, fn, args, interval):
+        self.fn = fn
+        self.args = args
+        self.interval = interval
+        self.cancelled = False
+
+    def cancel(self):
+        """Stop the task from running again."""
+        self.cancelled = True
+
+
+class Scheduler:
+    """Runs periodic tasks from a min-heap on a single thread."""
+
+    def __init__(self, jitter_samples=1000, clock=time.monotonic):
+        """
+        Args:
+            jitter_samples: Number of recent tick jitter samples kept for stats
+            clock: Monotonic time source
+        """
+        self.clock = clock
+        self._heap = []  # (due, seq, task); cancelled tasks are skipped lazily
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+
+        self._jitter = deque(maxlen=jitter_samples)  # Seconds late, recent ticks
+        self._max_jitter = 0.0
+        self._ticks = 0
+        self._errors = 0
+
+    def call_every(self, interval, fn, *args, delay=None):
+        """Run fn(*args) every interval seconds, first after delay (default: interval)."""
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        task = Task(fn, args, interval)
+        self._push(self.clock() + (interval if delay is None else delay), task)
+        return task
+
+    def _push(self, due, task):
+        with self._cond:
+            heapq.heappush(self._heap, (due, next(self._seq), task))
+            if not self._running:
+                self._running = True
+                self._thread = threading.Thread(target=self._run, name='scheduler', daemon=True)
+                self._thread.start()
+            elif self._heap[0][2] is task:
+                self._cond.notify()  # New earliest deadline
+
+    def stop(self):
+        """Stop the loop thread. Pending tasks are dropped."""
+        with self._cond:
+            self._running = False
+            self._heap.clear()
+            self._cond.notify()
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._running:
+                    if self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                        continue
+                    timeout = self._heap[0][0] - self.clock() if self._heap else None
+                    if timeout is not None and timeout <= 0:
+                        break
+                    self._cond.wait(timeout)
+                if not self._running:
+                    return
+                due, _, task = heapq.heappop(self._heap)
+
+            now = self.clock()
+            late = now - due
+            self._jitter.append(late)
+            self._max_jitter = max(self._max_jitter, late)
+            self._ticks += 1
+
+            try:
+                task.fn(*task.args)
+            except Exception as e:
+                self._errors += 1
+                print(f"Error in scheduled task {getattr(task.fn, '__name__', task.fn)}: {e}")
+
+            if not task.cancelled:
+                # Keep a fixed cadence, but skip missed ticks instead of bursting
+                next_due = due + task.interval
+                if next_due <= now:
+                    next_due = now + task.interval
+                with self._cond:
+                    if self._running:
+                        heapq.heappush(self._heap, (next_due, next(self._seq), task))
+
+    def stats(self):
+        """Return tick counts and jitter (how late tasks ran) in milliseconds."""
+        with self._cond:
+            pending = sum(1 for _, _, task in self._heap if not task.cancelled)
+        samples = sorted(self._jitter)
+
+        def pct(p):
+            if not samples:
+                return 0.0
+            return samples[min(len(samples) - 1, int(p / 100 * len(samples)))] * 1000
+
+        return {
+            'ticks': self._ticks,
+            'errors': self._errors,
+            'pending_tasks': pending,
+            'jitter_ms': {
+                'mean': sum(samples) / len(samples) * 1000 if samples else 0.0,
+                'p50': pct(50),
+                'p99': pct(99),
+                'max': self._max_jitter * 1000
+            },
+            'threads': threading.active_count()
+        }
@@ -0,0 +1,202 @@
+"""Lazily decaying volume model for Whack-A-Volume.
+
+Instead of reading and writing the system volume on every decay step, the
+model keeps the last known level and when it was set. The current level is
+derived from the decay rate when it is read, and the system volume is only
+written when sync() is called (on a coarse interval or after a hit).
+"""
+
+import itertools
+import queue
+import threading
+import time
+
+
+class DecayLease:
+    """Keeps the volume decaying until cancelled."""
+
+    def __init__(self, model):
+        self._model = model
+        self.cancelled = False
+
+    def cancel(self):
+        """Release the lease; decay stops once no leases remain."""
+        with self._model.lock:
+            if self.cancelled:
+                return
+            self.cancelled = True
+        self._model._release_decay()
+
+
+class VolumeModel:
+    """Last known volume level plus a decay rate, evaluated on read."""
+
+    def __init__(self, reader, writer, decay_rate=5.0, clock=time.monotonic):
+        """
+        Args:
+            reader: Callable returning the system volume (0-100)
+            writer: Callable setting the system volume, returning True on success
+            decay_rate: Volume points lost per second while decaying
+            clock: Monotonic time source
+        """
+        self.reader = reader
+        self.writer = writer
+        self.decay_rate = decay_rate
+        self.clock = clock
+        self.lock = threading.Lock()
+
+        self._level = None  # Level at _stamp, loaded from the system on first use
+        self._stamp = clock()
+        self._leases = 0  # Active decay leases (one per running game)
+        self._written = None  # Last level written to or read from the system
+        self.writes = 0
+        self.reads = 0
+
+    def _current(self, now):
+        # Caller must hold lock
+        if self._level is None:
+            self._level = float(self.reader())
+            self._written = round(self._level)
+            self._stamp = now
+            self.reads += 1
+        if self._leases:
+            return max(0.0, self._level - self.decay_rate * (now - self._stamp))
+        return self._level
+
+    def _anchor(self, now):
+        # Fold elapsed decay into the stored level before the rate changes
+        self._level = self._current(now)
+        self._stamp = now
+
+    def read(self):
+        """Return the modelled current volume without touching the system."""
+        with self.lock:
+            return round(self._current(self.clock()))
+
+    def rate(self):
+        """Return the current decay rate in points per second."""
+        with self.lock:
+            return self.decay_rate if self._leases else 0.0
+
+    def set(self, level):
+        """Set the modelled volume. The system is updated on the next sync()."""
+        level = max(0, min(100, int(level)))
+        with self.lock:
+            self._current(self.clock())
+            self._level = float(level)
+            self._stamp = self.clock()
+        return level
+
+    def start_decay(self):
+        """Start decaying (if not already) and return a lease that stops it."""
+        with self.lock:
+            self._anchor(self.clock())
+            self._leases += 1
+        return DecayLease(self)
+
+    def _release_decay(self):
+        with self.lock:
+            self._anchor(self.clock())
+            self._leases = max(0, self._leases - 1)
+
+    def pending(self):
+        """Whether the modelled level differs from the one last written to the system."""
+        with self.lock:
+            if self._level is None:
+                return False
+            return round(self._current(self.clock())) != self._written
+
+    def sync(self):
+        """Write the modelled level to the system if it changed.
+
+        When nothing is pending and the volume is not decaying, the system
+        volume is read instead so changes made outside the game are picked up.
+
+        Returns:
+            The current level
+        """
+        with self.lock:
+            now = self.clock()
+            level = round(self._current(now))
+            pending = level != self._written
+            idle = not self._leases
+
+        if pending:
+            if self.writer(level):
+                self.writes += 1
+                with self.lock:
+                    self._written = level
+        elif idle:
+            external = self.reader()
+            self.reads += 1
+            with self.lock:
+                # Only adopt it if the model was not changed in the meantime
+                if round(self._current(self.clock())) == level and external != level:
+                    self._level = float(external)
+                    self._stamp = self.clock()
+                    level = external
+                self._written = external
+        return level
+
+
+class VolumeApplier:
+    """Background thread that writes the model's latest level to the system.
+
+    Requests are coalesced: however many arrive while a write is in flight,
+    only the most recent modelled level is written next.
+    """
+
+    def __init__(self, model, on_applied=None):
+        """
+        Args:
+            model: VolumeModel to sync
+            on_applied: Called as on_applied(level, seq) after each write, where
+                seq is the latest request number the write covers
+        """
+        self.model = model
+        self.on_applied = on_applied
+        # SimpleQueue.put never blocks, so submitting from request threads
+        # cannot queue up behind the applier thread
+        self._requests = queue.SimpleQueue()
+        self._seq = itertools.count(1)
+        self._applied = 0  # Latest request covered by a completed write
+        self._applied_cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name='volume-applier', daemon=True)
+        self._thread.start()
+
+    def submit(self):
+        """Ask for the current modelled level to be written. Returns a request number."""
+        seq = next(self._seq)
+        self._requests.put(seq)
+        return seq
+
+    def wait(self, seq, timeout=None):
+        """Wait until request seq has been applied. Returns True if it was."""
+        with self._applied_cond:
+            return self._applied_cond.wait_for(lambda: self._applied >= seq, timeout=timeout)
+
+    def flush(self, timeout=None):
+        """Write the current modelled level and wait for it. Returns True if it was written."""
+        return self.wait(self.submit(), timeout)
+
+    def _run(self):
+        while True:
+            seq = self._requests.get()
+            # Coalesce everything that queued up while the last write ran
+            try:
+                while True:
+                    seq = max(seq, self._requests.get_nowait())
+            except queue.Empty:
+                pass
+
+            try:
+                level = self.model.sync()
+            except Exception as e:
+                print(f"Error applying volume: {e}")
+                level = None
+
+            with self._applied_cond:
+                self._applied = max(self._applied, seq)
+                self._applied_cond.notify_all()
+            if level is not None and self.on_applied:
+                self.on_applied(level, seq)